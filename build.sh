@@ -15,4 +15,7 @@ python manage.py collectstatic --no-input
 echo "🔄 Aplicando migraciones..."
 python manage.py migrate
 
+echo "🧊 Creando tabla de caché (si se usa CACHE_DB)..."
+python manage.py createcachetable
+
 echo "✅ Build completado!"
@@ -4,6 +4,7 @@ Django settings for config project.
 
 from pathlib import Path
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -32,6 +33,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'heladeria.middleware.MedicionMiddleware',  # Consultas, tiempos y Server-Timing por petición
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -44,7 +46,8 @@ ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates que mide el tiempo de render por petición (heladeria/middleware.py)
+        'BACKEND': 'heladeria.middleware.DjangoTemplatesMedidas',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -74,6 +77,112 @@ DATABASES = {
 }
 
 
+# Caché
+# Por defecto en memoria local (un proceso). Para varios workers de gunicorn usa un
+# backend compartido para que la invalidación del catálogo llegue a todos:
+# REDIS_URL (requiere el paquete redis) o CACHE_DB=True (tabla creada con createcachetable)
+REDIS_URL = config('REDIS_URL', default='')
+CACHE_DB = config('CACHE_DB', default=False, cast=bool)
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+elif CACHE_DB:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'heladeria_cache',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'heladeria',
+            # Una tarjeta por producto y rol: el límite por defecto (300) se queda corto
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
+# Segundos que se guardan los datos y fragmentos del catálogo (se invalidan por versión)
+# Con la caché en memoria la invalidación solo llega al worker que hizo el cambio: los
+# demás sirven el catálogo viejo hasta que vence, por eso el valor por defecto es corto
+CATALOGO_CACHE_TIMEOUT = config(
+    'CATALOGO_CACHE_TIMEOUT', default=3600 if REDIS_URL or CACHE_DB else 30, cast=int
+)
+
+# Segundos que se guarda cada reporte de analítica de ventas (por rango y granularidad)
+ANALITICA_CACHE_TIMEOUT = config('ANALITICA_CACHE_TIMEOUT', default=60, cast=int)
+
+# Segundos que se guarda el consumo diario de ingredientes (pronosticar_inventario).
+# Con una caché en memoria cada worker lo recalcula al vencer; con una compartida la
+# corrida de cron lo renueva para todos
+PRONOSTICO_CACHE_TIMEOUT = config('PRONOSTICO_CACHE_TIMEOUT', default=3600, cast=int)
+
+
+# Vistas asíncronas del catálogo (home, producto_lista, producto_detalle)
+# Actívalo solo al desplegar con ASGI: gunicorn config.asgi:application -k uvicorn.workers.UvicornWorker
+CATALOGO_ASYNC = config('CATALOGO_ASYNC', default=False, cast=bool)
+
+
+# Medición por petición (heladeria/middleware.py)
+# Cabecera Server-Timing con tiempo de base de datos, plantillas y total
+# Por defecto solo con DEBUG: la cabecera la ve cualquier cliente, también anónimo
+MEDICION_SERVER_TIMING = config('MEDICION_SERVER_TIMING', default=DEBUG, cast=bool)
+
+# Presupuesto por nombre de ruta: si una petición lo supera se registra una advertencia
+# Métricas: consultas, db_ms, plantillas_ms, total_ms
+# El máximo de consultas (con caché fría) lo verifican heladeria/tests/test_consultas.py y
+# python manage.py verificar_consultas
+PRESUPUESTOS_RUTAS = {
+    'home': {'consultas': 4, 'total_ms': 200},
+    'producto_lista': {'consultas': 5, 'total_ms': 200},
+    'producto_detalle': {'consultas': 6, 'total_ms': 200},
+    'producto_rentable': {'consultas': 4, 'total_ms': 200},
+    'api_catalogo': {'consultas': 4, 'total_ms': 150},
+    'dashboard': {'consultas': 6, 'total_ms': 300},
+    # POST válido medido con verificar_consultas (primera venta del día de cada producto)
+    # más uno por si la venta agota un ingrediente (recalcula la disponibilidad)
+    'venta_crear': {'consultas': 18, 'total_ms': 500},
+    # Pedido de 5 líneas (el formulario completo): cada línea registra su fila de VentaDiaria
+    'pedido_crear': {'consultas': 38, 'total_ms': 800},
+    'venta_lista': {'consultas': 8, 'total_ms': 500},
+    'venta_analitica': {'consultas': 4, 'total_ms': 500},
+    'mis_compras': {'consultas': 6, 'total_ms': 300},
+    'ingrediente_lista': {'consultas': 4, 'total_ms': 200},
+    'ingrediente_pronostico': {'consultas': 4, 'total_ms': 300},
+    # Listas del admin (verificar_consultas las recorre como superusuario)
+    'admin_usuario': {'consultas': 5},
+    'admin_ingrediente': {'consultas': 5},
+    'admin_producto': {'consultas': 5},
+    'admin_venta': {'consultas': 6},
+    'admin_pedido': {'consultas': 7},
+    'admin_ventadiaria': {'consultas': 8},
+    'admin_inventariomovimiento': {'consultas': 5},
+    'admin_inventariocheckpoint': {'consultas': 5},
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'heladeria': {
+            'handlers': ['console'],
+            'level': config('HELADERIA_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -121,6 +230,33 @@ LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'home'
 
+# El usuario (con su rol) se guarda en caché unos segundos: las peticiones autenticadas
+# no consultan la tabla de usuarios. Se invalida al guardar el usuario (heladeria/signals.py)
+# Solo se usa con una caché compartida (REDIS_URL o CACHE_DB); con LocMem se lee de la base de datos
+# ModelBackend sigue en la lista: las sesiones abiertas antes guardan su ruta en
+# _auth_user_backend y sin ella se cerrarían todas al desplegar. Los inicios de sesión
+# nuevos los resuelve UsuarioCacheBackend (va primero)
+AUTHENTICATION_BACKENDS = [
+    'heladeria.backends.UsuarioCacheBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+USUARIO_CACHE_TIMEOUT = config('USUARIO_CACHE_TIMEOUT', default=60, cast=int)
+
+# Segundos que se guarda el total gastado de cada cliente (mis_compras). Se borra con cada
+# venta suya; solo se usa con una caché compartida
+TOTAL_GASTADO_CACHE_TIMEOUT = config('TOTAL_GASTADO_CACHE_TIMEOUT', default=86400, cast=int)
+
+# Sesiones leídas desde la caché (y guardadas también en la base de datos)
+# Requiere una caché compartida (REDIS_URL o CACHE_DB): con LocMem un logout solo borraría
+# la sesión en la caché del worker que lo atendió
+if config('SESSION_CACHE', default=False, cast=bool):
+    if CACHES['default']['BACKEND'].endswith('LocMemCache'):
+        raise ImproperlyConfigured('SESSION_CACHE=True requiere REDIS_URL o CACHE_DB=True (caché compartida).')
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Los mensajes (messages.success, etc.) viajan en una cookie, no en la sesión
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
 # ============================================
 # CONFIGURACIÓN PARA DESPLIEGUE EN PRODUCCIÓN
 # ============================================
@@ -143,8 +279,19 @@ if not DEBUG:
     MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
     STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
     
+    # Plantillas compiladas una sola vez por proceso (gunicorn.conf.py las compila al arrancar)
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+    
     # Configuraciones de seguridad para producción
     SECURE_SSL_REDIRECT = True
+    # Render termina HTTPS en su proxy y avisa con X-Forwarded-Proto (sin esto, redirección infinita)
+    SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
     SESSION_COOKIE_SECURE = True
     CSRF_COOKIE_SECURE = True
     SECURE_BROWSER_XSS_FILTER = True
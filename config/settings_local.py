@@ -0,0 +1,27 @@
+"""
+Perfil local: SQLite y caché en memoria, sin PostgreSQL ni docker-compose.
+
+Uso:
+    python manage.py migrate --settings=config.settings_local
+    python manage.py benchmark_vistas --settings=config.settings_local
+(o exporta DJANGO_SETTINGS_MODULE=config.settings_local)
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, config
+
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': config('SQLITE_PATH', default=str(BASE_DIR / 'db.sqlite3')),
+    }
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'heladeria-local',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
@@ -0,0 +1,84 @@
+"""
+Configuración de gunicorn para producción.
+
+Uso:
+    gunicorn config.wsgi:application -c gunicorn.conf.py
+
+Variables de entorno (todas opcionales):
+    PORT                  puerto (Render lo define)
+    WEB_CONCURRENCY       número de workers (por defecto 2 x CPU + 1, máximo GUNICORN_MAX_WORKERS)
+    GUNICORN_MAX_WORKERS  tope de workers cuando se calculan por CPU (por defecto 8)
+    GUNICORN_THREADS      hilos por worker (por defecto 2; con 1 se usan workers sync)
+    CALENTAR_AL_ARRANCAR  False para no calentar la aplicación antes de aceptar tráfico
+"""
+
+import multiprocessing
+import os
+
+
+def _entero(nombre, defecto):
+    return int(os.environ.get(nombre) or defecto)
+
+
+bind = f'0.0.0.0:{_entero("PORT", 8000)}'
+
+# Workers: la aplicación espera sobre todo a la base de datos, así que 2 x CPU + 1.
+# El tope evita que un contenedor pequeño en una máquina con muchos CPU arranque
+# más workers de los que caben en memoria
+workers = _entero(
+    'WEB_CONCURRENCY',
+    min(multiprocessing.cpu_count() * 2 + 1, _entero('GUNICORN_MAX_WORKERS', 8)),
+)
+threads = _entero('GUNICORN_THREADS', 2)
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+# Carga la aplicación una vez en el maestro: los workers la heredan con fork
+preload_app = True
+
+# Conexiones keep-alive (detrás del proxy de Render) y timeouts
+keepalive = 5
+timeout = 30
+graceful_timeout = 30
+
+# Reinicia cada worker tras ~1000 peticiones (con jitter para que no se reinicien todos juntos)
+max_requests = 1000
+max_requests_jitter = 100
+
+accesslog = '-'
+errorlog = '-'
+
+
+def _calentar_activo():
+    return os.environ.get('CALENTAR_AL_ARRANCAR', 'True').lower() not in ('false', '0', 'no')
+
+
+def on_starting(server):
+    """
+    En el maestro, después de cargar la aplicación (preload_app) y antes de abrir el puerto:
+    la plataforma no envía tráfico hasta que la aplicación está caliente
+    """
+    if not _calentar_activo():
+        return
+
+    import config.wsgi  # noqa: F401  (sin preload_app, aquí se configura Django)
+    from django.db import connections
+    from heladeria.arranque import calentar
+
+    tiempos = calentar()
+    server.log.info('Calentamiento en %.1f ms', sum(tiempos.values()) * 1000)
+    # Los sockets de la base de datos no se comparten entre procesos
+    connections.close_all()
+
+
+def post_worker_init(worker):
+    """En cada worker: abre sus propias conexiones a la base de datos"""
+    if not _calentar_activo():
+        return
+
+    from heladeria.arranque import abrir_conexiones, abrir_conexiones_hilos
+
+    pool = getattr(worker, 'tpool', None)
+    if pool is not None:
+        abrir_conexiones_hilos(pool, worker.cfg.threads)
+    else:
+        abrir_conexiones()
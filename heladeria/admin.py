@@ -1,5 +1,9 @@
 from django.contrib import admin
-from .models import Usuario, Ingrediente, Producto, ProductoIngrediente, Venta
+from .periodos import PERIODOS, rango_periodo
+from .models import (
+    Usuario, Ingrediente, Producto, ProductoIngrediente, Pedido, Venta, VentaDiaria,
+    InventarioMovimiento, InventarioCheckpoint
+)
 
 
 # Configuración del panel de administración para Usuario
@@ -30,7 +34,7 @@ class UsuarioAdmin(admin.ModelAdmin):
 # Configuración del panel de administración para Ingrediente
 @admin.register(Ingrediente)
 class IngredienteAdmin(admin.ModelAdmin):
-    list_display = ['nombre', 'tipo', 'precio', 'calorias', 'inventario', 'es_vegetariano', 'es_sano']
+    list_display = ['nombre', 'tipo', 'precio', 'calorias', 'inventario', 'fragmentos', 'es_vegetariano', 'es_sano']
     list_filter = ['tipo', 'es_vegetariano', 'es_sano']
     search_fields = ['nombre', 'sabor']
     ordering = ['nombre']
@@ -53,10 +57,9 @@ class IngredienteAdmin(admin.ModelAdmin):
     
     def renovar_inventario_complementos(self, request, queryset):
         """Acción para renovar inventario de complementos seleccionados"""
-        count = 0
-        for ingrediente in queryset:
-            if ingrediente.renovar_inventario():
-                count += 1
+        # Un solo UPDATE para todos los complementos seleccionados, con su movimiento en el libro
+        # (misma regla que Ingrediente.renovar_inventario; también invalida el catálogo)
+        count = queryset.renovar_inventario()
         self.message_user(request, f'{count} complementos renovados (inventario en 0).')
     renovar_inventario_complementos.short_description = 'Renovar inventario de complementos'
 
@@ -71,8 +74,8 @@ class ProductoIngredienteInline(admin.TabularInline):
 # Configuración del panel de administración para Producto
 @admin.register(Producto)
 class ProductoAdmin(admin.ModelAdmin):
-    list_display = ['nombre', 'tipo', 'precio_publico', 'mostrar_costo', 'mostrar_rentabilidad', 'mostrar_calorias']
-    list_filter = ['tipo']
+    list_display = ['nombre', 'tipo', 'precio_publico', 'mostrar_costo', 'mostrar_rentabilidad', 'mostrar_calorias', 'disponible']
+    list_filter = ['tipo', 'disponible']
     search_fields = ['nombre']
     ordering = ['nombre']
     inlines = [ProductoIngredienteInline]
@@ -87,34 +90,60 @@ class ProductoAdmin(admin.ModelAdmin):
         }),
     )
     
-    # Métodos para mostrar información calculada
+    def get_queryset(self, request):
+        """Rentabilidad calculada en la consulta del listado (costo y calorías están guardados)"""
+        return super().get_queryset(request).with_metrics()
+    
+    # Métodos para mostrar información calculada (ordenables por columna)
     def mostrar_costo(self, obj):
         """Muestra el costo de producción"""
-        return f"${obj.calcular_costo():.2f}"
+        return f"${obj.costo:.2f}"
     mostrar_costo.short_description = 'Costo'
+    mostrar_costo.admin_order_field = 'costo'
     
     def mostrar_rentabilidad(self, obj):
         """Muestra la rentabilidad del producto"""
-        return f"${obj.calcular_rentabilidad():.2f}"
+        return f"${obj.rentabilidad:.2f}"
     mostrar_rentabilidad.short_description = 'Rentabilidad'
+    mostrar_rentabilidad.admin_order_field = 'rentabilidad'
     
     def mostrar_calorias(self, obj):
         """Muestra las calorías totales"""
-        return f"{obj.calcular_calorias()} cal"
+        return f"{obj.calorias_totales} cal"
     mostrar_calorias.short_description = 'Calorías'
+    mostrar_calorias.admin_order_field = 'calorias_totales'
+
+
+# Filtro por periodo (hoy, semana, mes) usando rangos de fecha indexados
+# Sirve para cualquier modelo con un DateTimeField `fecha` indexado (Venta, Pedido)
+class PeriodoFilter(admin.SimpleListFilter):
+    title = 'Periodo'
+    parameter_name = 'periodo'
+    
+    def lookups(self, request, model_admin):
+        return PERIODOS
+    
+    def queryset(self, request, queryset):
+        if self.value() in dict(PERIODOS):
+            inicio, fin = rango_periodo(self.value())
+            return queryset.filter(fecha__gte=inicio, fecha__lt=fin)
+        return queryset
 
 
 # Configuración del panel de administración para Venta
 @admin.register(Venta)
 class VentaAdmin(admin.ModelAdmin):
     list_display = ['id', 'producto', 'usuario', 'cantidad', 'total', 'fecha']
-    list_filter = ['fecha', 'producto']
+    # Trae producto y usuario con un JOIN en vez de una consulta por fila
+    list_select_related = ['producto', 'usuario']
+    # Navegación por fechas con rangos [inicio, fin) que usan el índice de fecha
+    # (date_hierarchy agrupa por día convirtiendo la zona horaria fila por fila)
+    list_filter = [PeriodoFilter, 'producto']
     search_fields = ['producto__nombre', 'usuario__username']
     ordering = ['-fecha']  # Más recientes primero
-    date_hierarchy = 'fecha'  # Navegación por fechas
     
     # Solo lectura (no se pueden editar ventas una vez creadas)
-    readonly_fields = ['producto', 'usuario', 'cantidad', 'total', 'fecha']
+    readonly_fields = ['producto', 'usuario', 'pedido', 'cantidad', 'total', 'fecha']
     
     def has_add_permission(self, request):
         """No permitir agregar ventas desde el admin (se hacen desde la app)"""
@@ -123,3 +152,88 @@ class VentaAdmin(admin.ModelAdmin):
     def has_change_permission(self, request, obj=None):
         """No permitir editar ventas"""
         return False
+
+
+# Configuración inline para mostrar las ventas (líneas) dentro de un pedido
+class VentaInline(admin.TabularInline):
+    model = Venta
+    extra = 0
+    fields = ['producto', 'cantidad', 'total', 'fecha']
+    readonly_fields = ['producto', 'cantidad', 'total', 'fecha']
+    can_delete = False
+
+
+# Configuración del panel de administración para Pedido
+@admin.register(Pedido)
+class PedidoAdmin(admin.ModelAdmin):
+    list_display = ['id', 'usuario', 'total', 'fecha']
+    list_select_related = ['usuario']
+    # Rangos [inicio, fin) sobre el índice de fecha, como en VentaAdmin (sin date_hierarchy)
+    list_filter = [PeriodoFilter]
+    search_fields = ['usuario__username']
+    ordering = ['-fecha']
+    inlines = [VentaInline]
+    readonly_fields = ['usuario', 'total', 'fecha']
+    
+    def has_add_permission(self, request):
+        """Los pedidos se hacen desde la app"""
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        """No permitir editar pedidos"""
+        return False
+
+
+# Configuración del panel de administración para el resumen diario (solo lectura)
+@admin.register(VentaDiaria)
+class VentaDiariaAdmin(admin.ModelAdmin):
+    list_display = ['fecha', 'producto', 'ventas', 'cantidad', 'total']
+    list_filter = ['producto']
+    list_select_related = ['producto']
+    ordering = ['-fecha']
+    date_hierarchy = 'fecha'
+    
+    def has_add_permission(self, request):
+        """El resumen se mantiene automáticamente con cada venta"""
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+# Libro de movimientos de inventario (solo lectura: las filas nunca se modifican)
+@admin.register(InventarioMovimiento)
+class InventarioMovimientoAdmin(admin.ModelAdmin):
+    list_display = ['fecha', 'ingrediente', 'tipo', 'cantidad', 'venta']
+    list_filter = ['tipo']
+    # str(venta) usa venta.producto.nombre
+    list_select_related = ['ingrediente', 'venta__producto']
+    search_fields = ['ingrediente__nombre']
+    ordering = ['-fecha']
+    raw_id_fields = ['venta']
+    
+    def has_add_permission(self, request):
+        """Los movimientos se registran automáticamente con cada cambio de inventario"""
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        """Solo compactar_inventario borra movimientos (ya resumidos en puntos de control)"""
+        return False
+
+
+# Puntos de control del libro (los crea compactar_inventario)
+@admin.register(InventarioCheckpoint)
+class InventarioCheckpointAdmin(admin.ModelAdmin):
+    list_display = ['fecha', 'ingrediente', 'saldo']
+    list_select_related = ['ingrediente']
+    search_fields = ['ingrediente__nombre']
+    ordering = ['-fecha']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
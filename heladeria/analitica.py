@@ -0,0 +1,88 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DateField, F, Q, Sum
+from django.db.models.functions import ExtractHour, TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import Venta
+from .periodos import rango_fechas
+
+
+# Analítica de ventas por franja de tiempo
+# Todo se agrupa en la base de datos (GROUP BY sobre el rango indexado de Venta.fecha),
+# en la zona horaria local; Python solo recibe una fila por franja
+
+GRANULARIDADES = [
+    ('hora', 'Hora del día'),
+    ('dia', 'Día'),
+    ('semana', 'Semana'),
+    ('mes', 'Mes'),
+]
+
+AGRUPACIONES = [
+    ('total', 'Total'),
+    ('tipo', 'Por tipo de producto'),
+    ('producto', 'Por producto'),
+]
+
+# Columnas extra de cada agrupación: (campos de Venta, anotaciones)
+COLUMNAS_AGRUPACION = {
+    'total': ([], {}),
+    'tipo': ([], {'tipo': F('producto__tipo')}),
+    'producto': (['producto_id'], {'nombre': F('producto__nombre')}),
+}
+
+CENTAVO = Decimal('0.01')
+
+# Rango máximo en días (por día y por producto ya son cientos de miles de filas)
+MAX_DIAS = 366
+
+
+def franja(granularidad):
+    """Expresión de la franja de cada venta en la zona horaria local"""
+    zona = timezone.get_current_timezone()
+    if granularidad == 'hora':
+        # Hora del día (0-23): todas las ventas de las 15 h juntas, sin importar el día
+        return ExtractHour('fecha', tzinfo=zona)
+    truncar = {'dia': TruncDay, 'semana': TruncWeek, 'mes': TruncMonth}[granularidad]
+    return truncar('fecha', output_field=DateField(), tzinfo=zona)
+
+
+def resumen_ventas(desde, hasta, granularidad, agrupacion='total'):
+    """
+    Ingresos, unidades y tickets por franja (y por tipo o producto) entre desde y hasta
+    (fechas locales, ambas incluidas). Un ticket es un pedido o una venta suelta.
+
+    Resultado en caché por (rango, granularidad, agrupación) durante ANALITICA_CACHE_TIMEOUT.
+    """
+    clave = f'heladeria:analitica:{granularidad}:{agrupacion}:{desde}:{hasta}'
+    filas = cache.get(clave)
+    if filas is not None:
+        return filas
+
+    inicio, fin = rango_fechas(desde, hasta)
+    campos, anotaciones = COLUMNAS_AGRUPACION[agrupacion]
+    columnas = [*campos, *anotaciones]
+    consulta = (
+        Venta.objects.filter(fecha__gte=inicio, fecha__lt=fin)
+        .annotate(periodo=franja(granularidad), **anotaciones)
+        .values('periodo', *columnas)
+        .annotate(
+            ingresos=Sum('total'),
+            unidades=Sum('cantidad'),
+            tickets=Count('pedido', distinct=True) + Count('pk', filter=Q(pedido__isnull=True)),
+        )
+        .order_by('periodo', *columnas)
+    )
+    filas = [
+        {
+            **fila,
+            'periodo': fila['periodo'] if granularidad == 'hora' else fila['periodo'].isoformat(),
+            'ingresos': str(fila['ingresos'].quantize(CENTAVO)),
+        }
+        for fila in consulta
+    ]
+    cache.set(clave, filas, settings.ANALITICA_CACHE_TIMEOUT)
+    return filas
@@ -5,3 +5,7 @@ class HeladeriaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'heladeria'
     verbose_name = 'Heladería'
+    
+    def ready(self):
+        # Registrar las señales de la aplicación
+        from . import signals  # noqa: F401
@@ -0,0 +1,130 @@
+import logging
+from pathlib import Path
+from threading import Barrier
+from time import perf_counter
+
+from django.core.cache import cache
+from django.db import connections
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.urls import get_resolver, reverse
+
+from .cache import cache_compartida
+
+
+logger = logging.getLogger('heladeria')
+
+
+# Calentamiento al arrancar el servidor
+# gunicorn.conf.py lo corre en el proceso maestro (con preload_app) antes de abrir el
+# puerto y de crear los workers: cada worker hereda las vistas importadas y las plantillas
+# compiladas. Las conexiones a la base de datos se cierran antes del fork y cada worker
+# abre las suyas (abrir_conexiones_hilos)
+# El catálogo solo se precarga con una caché compartida (Redis, base de datos). Una caché
+# en memoria se copiaría a cada worker con fork (también a los que se reinician por
+# max_requests) y los cambios hechos en otros workers nunca le llegarían: con LocMem el
+# maestro la vacía antes del fork y cada worker arma la suya con datos actuales
+
+# Páginas públicas que se piden una vez al arrancar (llenan los fragmentos en caché,
+# como las tarjetas de productos de la página principal)
+PAGINAS = ['home', 'login']
+
+
+def cargar_urls():
+    """Importa todas las vistas y arma las tablas de reverse()"""
+    return len(get_resolver().reverse_dict)
+
+
+def compilar_plantillas():
+    """Compila cada plantilla .html (queda en el cached loader del motor)"""
+    total = 0
+    for motor in engines.all():
+        if not isinstance(motor, DjangoTemplates):
+            continue
+        # Los directorios de cada loader (el cached loader devuelve los de sus loaders internos)
+        directorios = dict.fromkeys(
+            directorio for cargador in motor.engine.template_loaders for directorio in cargador.get_dirs()
+        )
+        for directorio in map(Path, directorios):
+            for ruta in directorio.rglob('*.html'):
+                motor.get_template(ruta.relative_to(directorio).as_posix())
+                total += 1
+    return total
+
+
+def abrir_conexiones():
+    """Abre (o verifica) una conexión por base de datos configurada"""
+    for conexion in connections.all():
+        conexion.ensure_connection()
+    return len(connections.all())
+
+
+def precargar_catalogo():
+    """Productos, disponibilidad y JSON público del catálogo en la caché"""
+    from .catalogo import catalogo_json, productos_catalogo, stock_productos
+
+    productos = productos_catalogo()
+    stock_productos()
+    catalogo_json()
+    return len(productos)
+
+
+def pedir_paginas():
+    """Pide cada página de PAGINAS con todos los middlewares, como lo haría un visitante"""
+    from django.test import Client
+
+    cliente = Client()
+    estados = [f'{nombre}={cliente.get(reverse(nombre), secure=True).status_code}' for nombre in PAGINAS]
+    return ' '.join(estados)
+
+
+# (nombre, función, usa la caché)
+PASOS = [
+    ('urls', cargar_urls, False),
+    ('plantillas', compilar_plantillas, False),
+    ('conexiones', abrir_conexiones, False),
+    ('catalogo', precargar_catalogo, True),
+    ('paginas', pedir_paginas, True),
+]
+
+
+def calentar():
+    """
+    Corre los pasos y devuelve {paso: segundos}. Sin caché compartida se omiten los que
+    llenan la caché y se vacía la del proceso al terminar (no debe heredarse con fork).
+    Un paso que falla se registra y no impide el arranque (la primera petición hará el trabajo).
+    """
+    compartida = cache_compartida()
+    tiempos = {}
+    for nombre, paso, usa_cache in PASOS:
+        if usa_cache and not compartida:
+            logger.info('calentamiento paso=%s omitido (caché no compartida)', nombre)
+            continue
+        inicio = perf_counter()
+        try:
+            resultado = paso()
+        except Exception:
+            logger.exception('calentamiento paso=%s falló', nombre)
+            continue
+        tiempos[nombre] = perf_counter() - inicio
+        logger.info('calentamiento paso=%s resultado=%s ms=%.1f', nombre, resultado, tiempos[nombre] * 1000)
+    if not compartida:
+        # Por si algún paso escribió en la caché (versiones del catálogo, sesiones...)
+        cache.clear()
+    return tiempos
+
+
+def abrir_conexiones_hilos(pool, hilos, espera=10):
+    """
+    Abre las conexiones en cada hilo de un ThreadPoolExecutor (worker gthread de gunicorn).
+    Las conexiones de Django son por hilo: la barrera obliga a que cada tarea corra en un
+    hilo distinto del pool.
+    """
+    barrera = Barrier(hilos)
+
+    def abrir():
+        barrera.wait(espera)
+        return abrir_conexiones()
+
+    for futuro in [pool.submit(abrir) for _ in range(hilos)]:
+        futuro.result()
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+from django.core.cache import cache
+
+from .cache import cache_compartida
+
+
+def clave_usuario(user_id):
+    return f'heladeria:usuario:{user_id}'
+
+
+# Backend de autenticación que guarda el usuario (con su rol) en caché por unos segundos
+# AuthenticationMiddleware llama a get_user en cada petición autenticada; así las
+# verificaciones de rol (es_administrador, es_empleado, es_cliente) no consultan la base de datos
+# La caché se borra al guardar o eliminar el usuario (ver signals.py)
+# Solo con una caché compartida: con LocMem el borrado llegaría únicamente al worker que
+# guardó el usuario y los demás seguirían autorizando el rol viejo hasta que venza
+
+class UsuarioCacheBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user = super().authenticate(request, username=username, password=password, **kwargs)
+        if user is None:
+            # ModelBackend (que sigue en AUTHENTICATION_BACKENDS por las sesiones viejas)
+            # haría la misma verificación y otro hash de la contraseña: se corta aquí
+            raise PermissionDenied
+        return user
+    
+    def get_user(self, user_id):
+        if not cache_compartida():
+            return super().get_user(user_id)
+        clave = clave_usuario(user_id)
+        user = cache.get(clave)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(clave, user, settings.USUARIO_CACHE_TIMEOUT)
+        return user
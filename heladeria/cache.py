@@ -0,0 +1,98 @@
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+# Versiones del catálogo guardadas en la caché compartida
+# Cambiar la versión deja obsoletas todas las claves que la incluyen (sin borrarlas una a una)
+# Con un backend compartido (Redis, base de datos) la invalidación llega a todos los workers
+
+VERSION_CATALOGO = 'heladeria:catalogo:version'
+VERSION_STOCK = 'heladeria:stock:version'
+# Momento del último cambio del catálogo o del stock (para Last-Modified)
+MODIFICADO = 'heladeria:catalogo:modificado'
+
+
+def cache_compartida():
+    """True si todos los procesos ven la misma caché (Redis, base de datos, archivos)"""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def obtener_version(clave):
+    """Versión actual; si no existe (caché vacía o expulsada) se crea una nueva"""
+    version = cache.get(clave)
+    if version is None:
+        # Se parte de la hora actual para no reutilizar versiones anteriores
+        cache.add(clave, int(time.time() * 1000), timeout=None)
+        version = cache.get(clave)
+    return version
+
+
+async def aobtener_version(clave):
+    """Versión asíncrona de obtener_version (para las vistas ASGI)"""
+    version = await cache.aget(clave)
+    if version is None:
+        await cache.aadd(clave, int(time.time() * 1000), timeout=None)
+        version = await cache.aget(clave)
+    return version
+
+
+def incrementar_version(clave):
+    try:
+        cache.incr(clave)
+    except ValueError:
+        # La clave no existía: cualquier versión nueva sirve
+        obtener_version(clave)
+
+
+def version_catalogo():
+    return obtener_version(VERSION_CATALOGO)
+
+
+def version_stock():
+    return obtener_version(VERSION_STOCK)
+
+
+async def aversion_catalogo():
+    return await aobtener_version(VERSION_CATALOGO)
+
+
+async def aversion_stock():
+    return await aobtener_version(VERSION_STOCK)
+
+
+def ultima_modificacion():
+    """Fecha (UTC) del último cambio del catálogo o del stock"""
+    marca = cache.get(MODIFICADO)
+    if marca is None:
+        # Sin registro (caché vacía): se toma ahora como último cambio
+        marca = time.time()
+        cache.add(MODIFICADO, marca, timeout=None)
+    return datetime.fromtimestamp(marca, tz=timezone.utc)
+
+
+def invalidar_catalogo():
+    """Productos, precios o ingredientes cambiaron (también puede cambiar el stock)"""
+    incrementar_version(VERSION_CATALOGO)
+    incrementar_version(VERSION_STOCK)
+    cache.set(MODIFICADO, time.time(), timeout=None)
+
+
+def invalidar_stock():
+    """Solo cambió el inventario (por ejemplo, por una venta)"""
+    incrementar_version(VERSION_STOCK)
+    cache.set(MODIFICADO, time.time(), timeout=None)
+
+
+# Total gastado por cada cliente (historial en mis_compras)
+# Se borra al registrar o eliminar una de sus ventas (signals.py y Pedido.objects.crear)
+
+def clave_total_gastado(usuario_id):
+    return f'heladeria:usuario:{usuario_id}:total_gastado'
+
+
+def invalidar_total_gastado(*usuario_ids):
+    cache.delete_many([clave_total_gastado(usuario_id) for usuario_id in usuario_ids])
@@ -0,0 +1,127 @@
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import aversion_catalogo, aversion_stock, version_catalogo, version_stock
+from .models import Producto, ProductoIngrediente
+
+
+# Datos del catálogo en caché
+# Los productos (con métricas e ingredientes) dependen de la versión del catálogo;
+# la disponibilidad depende de la versión de stock, que cambia cuando un producto
+# se agota o vuelve a estar disponible
+# Las versiones síncrona y asíncrona comparten las mismas claves
+
+def productos_catalogo():
+    """Lista de productos con métricas e ingredientes precargados"""
+    clave = f'heladeria:catalogo:{version_catalogo()}:productos'
+    productos = cache.get(clave)
+    if productos is None:
+        productos = list(Producto.objects.with_metrics().prefetch_related('ingredientes'))
+        cache.set(clave, productos, settings.CATALOGO_CACHE_TIMEOUT)
+    return productos
+
+
+def stock_productos():
+    """Conjunto de ids de productos disponibles (una consulta sobre el índice de disponible)"""
+    clave = f'heladeria:stock:{version_stock()}:productos'
+    stock = cache.get(clave)
+    if stock is None:
+        stock = set(Producto.objects.disponibles().values_list('pk', flat=True))
+        cache.set(clave, stock, settings.CATALOGO_CACHE_TIMEOUT)
+    return stock
+
+
+def precargar_ingredientes(productos, relaciones):
+    """
+    Deja los ingredientes de cada producto en su caché de prefetch, igual que
+    prefetch_related (que en Django 4.2 no funciona con aiterator).
+    
+    Así producto.ingredientes.all en las plantillas no vuelve a consultar la base de datos.
+    """
+    por_producto = defaultdict(list)
+    for relacion in relaciones:
+        por_producto[relacion.producto_id].append(relacion.ingrediente)
+    
+    for producto in productos:
+        ingredientes = producto.ingredientes.all()
+        ingredientes._result_cache = sorted(por_producto[producto.pk], key=lambda i: i.nombre)
+        ingredientes._prefetch_done = True
+        producto._prefetched_objects_cache = {'ingredientes': ingredientes}
+
+
+async def aproductos_catalogo():
+    """Versión asíncrona de productos_catalogo (ORM asíncrono)"""
+    clave = f'heladeria:catalogo:{await aversion_catalogo()}:productos'
+    productos = await cache.aget(clave)
+    if productos is None:
+        productos = [producto async for producto in Producto.objects.with_metrics().aiterator()]
+        relaciones = [
+            relacion async for relacion in
+            ProductoIngrediente.objects.select_related('ingrediente').aiterator()
+        ]
+        precargar_ingredientes(productos, relaciones)
+        await cache.aset(clave, productos, settings.CATALOGO_CACHE_TIMEOUT)
+    return productos
+
+
+async def astock_productos():
+    """Versión asíncrona de stock_productos (ORM asíncrono)"""
+    clave = f'heladeria:stock:{await aversion_stock()}:productos'
+    stock = await cache.aget(clave)
+    if stock is None:
+        # values_list().aiterator() ejecuta la consulta dentro del event loop en Django 4.2;
+        # con objetos del modelo (solo el id) sí corre en un hilo
+        stock = {
+            producto.pk async for producto in
+            Producto.objects.disponibles().only('pk').aiterator()
+        }
+        await cache.aset(clave, stock, settings.CATALOGO_CACHE_TIMEOUT)
+    return stock
+
+
+def catalogo_json():
+    """
+    Catálogo público serializado como JSON compacto (bytes), en caché por versión.
+    
+    Solo incluye datos públicos: nada de costos, rentabilidad ni inventario.
+    """
+    clave = f'heladeria:catalogo:{version_catalogo()}:{version_stock()}:json'
+    contenido = cache.get(clave)
+    if contenido is None:
+        stock = stock_productos()
+        datos = {
+            'version': 1,
+            'productos': [
+                {
+                    'id': producto.pk,
+                    'nombre': producto.nombre,
+                    'tipo': producto.tipo,
+                    'precio': str(producto.precio_publico),
+                    'tipo_vaso': producto.tipo_vaso,
+                    'volumen_onzas': producto.volumen_onzas,
+                    'calorias': producto.calorias_totales,
+                    'disponible': producto.pk in stock,
+                    'ingredientes': [
+                        {
+                            'nombre': ingrediente.nombre,
+                            'tipo': ingrediente.tipo,
+                            'sabor': ingrediente.sabor,
+                            'calorias': ingrediente.calorias,
+                            'es_vegetariano': ingrediente.es_vegetariano,
+                            'es_sano': ingrediente.es_sano,
+                        }
+                        for ingrediente in producto.ingredientes.all()
+                    ],
+                }
+                for producto in productos_catalogo()
+            ],
+        }
+        # Sin espacios y con claves en orden fijo: menos bytes y mejor compresión gzip/brotli
+        contenido = json.dumps(
+            datos, ensure_ascii=False, separators=(',', ':'), sort_keys=True
+        ).encode('utf-8')
+        cache.set(clave, contenido, settings.CATALOGO_CACHE_TIMEOUT)
+    return contenido
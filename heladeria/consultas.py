@@ -0,0 +1,208 @@
+import random
+from io import StringIO
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+from . import datos_sinteticos
+from . import urls as heladeria_urls
+from .forms import LineaPedidoFormSet
+from .models import Pedido, Usuario, Venta
+
+
+# Presupuesto de consultas por ruta
+# Se recorren las rutas con nombre de heladeria/urls.py por rol, las listas del admin y
+# un POST válido a las rutas que venden, con datos pequeños y grandes: si una ruta hace
+# más consultas con más filas, tiene un N+1. Lo usan heladeria/tests/test_consultas.py
+# y el comando verificar_consultas (los dos sobre una base de datos de prueba)
+
+# ventas_reales pasan por Venta.save (con movimientos en el libro de inventario)
+TAMANOS = {
+    'pequeno': {'ingredientes': 12, 'productos': 8, 'clientes': 10, 'ventas': 200, 'ventas_reales': 4},
+    'grande': {'ingredientes': 120, 'productos': 80, 'clientes': 100, 'ventas': 5_000, 'ventas_reales': 40},
+}
+
+ROLES = [None, 'CLIENTE', 'EMPLEADO', 'ADMINISTRADOR']
+
+# Las listas del admin se recorren con un superusuario (ruta admin_<modelo>)
+SUPERUSUARIO = 'superusuario'
+
+# Rutas que además reciben un POST válido (una venta o un pedido de verdad) como cliente
+RUTAS_POST = ['venta_crear', 'pedido_crear']
+
+# Máximo de consultas para las rutas sin presupuesto en PRESUPUESTOS_RUTAS
+LIMITE_DEFECTO = 10
+
+
+class RutaConError(Exception):
+    """Una ruta respondió con error (o un POST no se completó): no se puede contar"""
+
+
+# ============================================
+# DATOS
+# ============================================
+
+def poblar(tamano, semilla=42):
+    """Vacía la base y la llena con datos del tamaño indicado: (usuarios, argumentos)"""
+    call_command('flush', interactive=False, verbosity=0)
+    cantidades = TAMANOS[tamano]
+    rng = random.Random(semilla)
+
+    ingredientes = datos_sinteticos.crear_ingredientes(rng, cantidades['ingredientes'])
+    productos = datos_sinteticos.crear_productos(rng, cantidades['productos'], ingredientes)
+    usuarios = {
+        rol: Usuario.objects.create_user(username=f'consultas_{rol.lower()}', password='x', rol=rol)
+        for rol in ROLES if rol
+    }
+    clientes = datos_sinteticos.crear_usuarios(cantidades['clientes'])
+    # Cada usuario de prueba también tiene historial (mis_compras crece con el tamaño)
+    compradores = clientes + [usuario.pk for usuario in usuarios.values()]
+    datos_sinteticos.crear_ventas(rng, cantidades['ventas'], productos, compradores)
+    call_command('reconstruir_ventas_diarias', stdout=StringIO())
+    # Ventas y un pedido por el camino normal: el admin del libro y de pedidos los lista
+    for producto in productos[:cantidades['ventas_reales']]:
+        Venta(producto=producto, usuario=usuarios['CLIENTE'], cantidad=1, total=producto.precio_publico).save()
+    Pedido.objects.crear(usuarios['CLIENTE'], [(producto, 1) for producto in productos[:3]])
+    usuarios[SUPERUSUARIO] = Usuario.objects.create_superuser(
+        username='consultas_superusuario', password='x', rol='ADMINISTRADOR'
+    )
+
+    # Productos sin ventas para los POST: la primera venta del día de cada producto
+    # también crea su fila en VentaDiaria (el caso con más consultas)
+    sin_ventas = datos_sinteticos.crear_productos(
+        rng, 1 + LineaPedidoFormSet.extra, ingredientes, prefijo='post '
+    )
+
+    argumentos = {
+        'producto': productos[0].pk,
+        'ingrediente': ingredientes[0].pk,
+        'sin_ventas': [producto.pk for producto in sin_ventas],
+    }
+    return usuarios, argumentos
+
+
+def datos_post(ruta, argumentos):
+    """Formulario válido para cada ruta de RUTAS_POST (con los productos sin ventas de poblar)"""
+    nuevos = argumentos['sin_ventas']
+    if ruta == 'venta_crear':
+        return {'producto': nuevos[0], 'cantidad': 1}
+    # Pedido con todas las líneas del formulario (la canasta más grande)
+    lineas = nuevos[1:]
+    datos = {'form-TOTAL_FORMS': len(lineas), 'form-INITIAL_FORMS': 0}
+    for i, pk in enumerate(lineas):
+        datos[f'form-{i}-producto'] = pk
+        datos[f'form-{i}-cantidad'] = 1
+    return datos
+
+
+# ============================================
+# CONTEO
+# ============================================
+
+def rutas():
+    for patron in heladeria_urls.urlpatterns:
+        if isinstance(patron, URLPattern) and patron.name:
+            yield patron
+
+
+def url_ruta(patron, argumentos):
+    if not patron.pattern.converters:
+        return reverse(patron.name)
+    # producto_detalle, producto_editar, ingrediente_eliminar...
+    modelo = patron.name.split('_')[0]
+    if modelo not in argumentos:
+        raise RutaConError(f'No sé qué pk usar para la ruta {patron.name}.')
+    return reverse(patron.name, kwargs={'pk': argumentos[modelo]})
+
+
+def modelos_admin():
+    """Modelos de heladeria registrados en el admin"""
+    return [modelo for modelo in admin.site._registry if modelo._meta.app_label == 'heladeria']
+
+
+def contar(tamano, semilla=42):
+    """{(ruta, rol): (consultas con caché fría, consultas con caché caliente)}"""
+    usuarios, argumentos = poblar(tamano, semilla)
+    conteos = {}
+    for patron in rutas():
+        url = url_ruta(patron, argumentos)
+        for rol in ROLES:
+            client = Client()
+            if rol:
+                client.force_login(usuarios[rol])
+            cache.clear()
+            frio = consultas(client, url)
+            caliente = consultas(client, url)
+            conteos[(patron.name, rol or 'anónimo')] = (frio, caliente)
+
+    # POST válidos: cada uno registra una venta o un pedido. El primero es la primera
+    # venta del día de sus productos y con caché fría; el segundo repite los productos
+    client = Client()
+    client.force_login(usuarios['CLIENTE'])
+    for ruta in RUTAS_POST:
+        url = reverse(ruta)
+        datos = datos_post(ruta, argumentos)
+        cache.clear()
+        frio = consultas(client, url, datos)
+        caliente = consultas(client, url, datos)
+        conteos[(ruta, 'CLIENTE POST')] = (frio, caliente)
+
+    client = Client()
+    client.force_login(usuarios[SUPERUSUARIO])
+    for modelo in modelos_admin():
+        opts = modelo._meta
+        url = reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+        cache.clear()
+        frio = consultas(client, url)
+        caliente = consultas(client, url)
+        conteos[(f'admin_{opts.model_name}', SUPERUSUARIO)] = (frio, caliente)
+    return conteos
+
+
+def consultas(client, url, datos=None):
+    """Consultas de un GET (o de un POST con `datos`, que debe redirigir: formulario válido)"""
+    with CaptureQueriesContext(connection) as capturadas:
+        respuesta = client.get(url) if datos is None else client.post(url, datos)
+        # Las respuestas en streaming consultan mientras se consumen
+        if respuesta.streaming:
+            b''.join(respuesta.streaming_content)
+    if respuesta.status_code >= 500:
+        raise RutaConError(f'{url} respondió {respuesta.status_code}')
+    if datos is not None and respuesta.status_code != 302:
+        raise RutaConError(f'POST a {url} no se completó (estado {respuesta.status_code})')
+    return len(capturadas)
+
+
+# ============================================
+# REPORTE
+# ============================================
+
+def limite_ruta(ruta, limite_defecto=LIMITE_DEFECTO):
+    return settings.PRESUPUESTOS_RUTAS.get(ruta, {}).get('consultas', limite_defecto)
+
+
+def reportar(conteos, limite_defecto=LIMITE_DEFECTO):
+    """
+    Una fila por ruta y rol: (ruta, rol, (frío, caliente) pequeño, (frío, caliente) grande,
+    límite, problemas). Sin problemas, la lista queda vacía.
+    """
+    pequeno, grande = conteos['pequeno'], conteos['grande']
+    filas = []
+    for clave, (frio_p, caliente_p) in pequeno.items():
+        ruta, rol = clave
+        frio_g, caliente_g = grande[clave]
+        limite = limite_ruta(ruta, limite_defecto)
+
+        problemas = []
+        if frio_g > frio_p or caliente_g > caliente_p:
+            problemas.append('crece con los datos')
+        if max(frio_p, frio_g) > limite:
+            problemas.append('supera el presupuesto')
+        filas.append((ruta, rol, (frio_p, caliente_p), (frio_g, caliente_g), limite, problemas))
+    return filas
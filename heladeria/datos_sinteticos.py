@@ -0,0 +1,238 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from itertools import accumulate, islice
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.utils import timezone
+
+from .models import Ingrediente, InventarioMovimiento, Producto, ProductoIngrediente, Usuario, Venta
+
+
+# Datos sintéticos para benchmarks y pruebas de carga
+# Todo se crea por lotes (bulk_create, o COPY en PostgreSQL) y con un random.Random
+# sembrado: la misma semilla produce siempre los mismos datos
+
+SABORES = ['Vainilla', 'Chocolate', 'Fresa', 'Mora', 'Limón', 'Café', 'Coco', 'Arequipe', 'Maracuyá', 'Menta']
+COMPLEMENTOS = ['Chispas', 'Salsa', 'Galleta', 'Nueces', 'Crema', 'Frutos rojos', 'Brownie', 'Caramelo']
+VASOS = ['Vidrio', 'Plástico', 'Cono']
+
+# Peso de cada hora local del día (0-23): poco movimiento de noche, pico en la tarde
+PESOS_HORAS = [1, 1, 1, 1, 1, 1, 2, 3, 4, 5, 7, 9, 11, 12, 14, 16, 17, 16, 14, 11, 8, 5, 3, 2]
+ACUMULADO_HORAS = list(accumulate(PESOS_HORAS))
+
+# Columnas de Venta en el orden de las filas de filas_ventas
+COLUMNAS_VENTAS = ('producto', 'usuario', 'cantidad', 'total', 'fecha')
+
+
+def en_lotes(iterable, tamano):
+    iterador = iter(iterable)
+    while lote := list(islice(iterador, tamano)):
+        yield lote
+
+
+# ============================================
+# CATÁLOGO Y USUARIOS
+# ============================================
+
+def crear_ingredientes(rng, cantidad, prefijo='', inventario=10**6, batch_size=1000):
+    """Mitad bases (con sabor) y mitad complementos"""
+    ingredientes = []
+    for i in range(cantidad):
+        base = i % 2 == 0
+        nombre = rng.choice(SABORES if base else COMPLEMENTOS)
+        ingredientes.append(Ingrediente(
+            nombre=f'{prefijo}{nombre} {i:05d}',
+            precio=Decimal(rng.randint(50, 800)) / 100,
+            calorias=rng.randint(20, 400),
+            inventario=inventario,
+            es_vegetariano=rng.random() < 0.6,
+            es_sano=rng.random() < 0.3,
+            tipo='BASE' if base else 'COMPLEMENTO',
+            sabor=nombre if base else None,
+        ))
+    ingredientes = Ingrediente.objects.bulk_create(ingredientes, batch_size=batch_size)
+    # El inventario inicial entra al libro como reposición
+    InventarioMovimiento.objects.registrar_ajustes(
+        (ingrediente.pk, 0, ingrediente.inventario) for ingrediente in ingredientes
+    )
+    return ingredientes
+
+
+def crear_productos(rng, cantidad, ingredientes, prefijo='', batch_size=1000):
+    """Productos con recetas válidas: una base y el resto complementos (o bases) distintos"""
+    bases = [ingrediente for ingrediente in ingredientes if ingrediente.tipo == 'BASE']
+    productos = []
+    for i in range(cantidad):
+        copa = i % 2 == 0
+        productos.append(Producto(
+            nombre=f'{prefijo}{"Copa" if copa else "Malteada"} {i:05d}',
+            precio_publico=Decimal(rng.randint(1500, 4000)) / 100,
+            tipo='COPA' if copa else 'MALTEADA',
+            tipo_vaso=rng.choice(VASOS) if copa else None,
+            volumen_onzas=None if copa else rng.choice([12, 16, 20]),
+        ))
+    productos = Producto.objects.bulk_create(productos, batch_size=batch_size)
+
+    relaciones = []
+    for producto in productos:
+        base = rng.choice(bases)
+        resto = rng.sample(ingredientes, Producto.NUM_INGREDIENTES)
+        receta = [base] + [ingrediente for ingrediente in resto if ingrediente != base]
+        relaciones.extend(
+            ProductoIngrediente(producto=producto, ingrediente=ingrediente)
+            for ingrediente in receta[:Producto.NUM_INGREDIENTES]
+        )
+    ProductoIngrediente.objects.bulk_create(relaciones, batch_size=batch_size)
+    # bulk_create no dispara señales: disponible, costo y calorías se calculan aparte
+    for lote in en_lotes(productos, batch_size):
+        Producto.objects.filter(pk__in=[producto.pk for producto in lote]).recalcular_receta()
+    return productos
+
+
+def crear_usuarios(cantidad, prefijo='cliente', rol='CLIENTE', password='heladeria', batch_size=5000):
+    """
+    Usuarios con la misma contraseña (el hash se calcula una sola vez).
+    Devuelve solo los ids: con 100k usuarios no conviene guardar los objetos.
+    """
+    hash_password = make_password(password)
+    usuarios = (
+        Usuario(username=f'{prefijo}{i:06d}', email=f'{prefijo}{i:06d}@heladeria.test',
+                password=hash_password, rol=rol)
+        for i in range(cantidad)
+    )
+    ids = []
+    for lote in en_lotes(usuarios, batch_size):
+        ids.extend(usuario.pk for usuario in Usuario.objects.bulk_create(lote))
+    return ids
+
+
+# ============================================
+# VENTAS
+# ============================================
+
+def filas_ventas(rng, cantidad, productos, usuario_ids, dias=90, zonas=None, lote=10_000):
+    """
+    Genera (producto_id, usuario_id, cantidad, total, fecha) sin crear objetos.
+    - Productos con popularidad desigual (unos pocos venden mucho)
+    - Horas según PESOS_HORAS en la hora local de cada zona (por defecto TIME_ZONE)
+    - Fechas en los últimos `dias` días
+    """
+    zonas = [ZoneInfo(zona) for zona in zonas] if zonas else [timezone.get_current_timezone()]
+    hoy = timezone.localdate()
+    # Medianoche local de cada día en cada zona (la hora se suma desde ahí)
+    medianoches = [
+        [datetime.combine(hoy - timedelta(days=d), time.min, tzinfo=zona) for d in range(dias)]
+        for zona in zonas
+    ]
+    ahora = timezone.now()
+
+    orden = list(range(len(productos)))
+    rng.shuffle(orden)
+    acumulado_productos = list(accumulate(1 / (posicion + 1) ** 0.8 for posicion in range(len(orden))))
+    precios = [producto.precio_publico for producto in productos]
+    ids_productos = [producto.pk for producto in productos]
+
+    restantes = cantidad
+    while restantes > 0:
+        n = min(lote, restantes)
+        restantes -= n
+        indices = rng.choices(orden, cum_weights=acumulado_productos, k=n)
+        horas = rng.choices(range(24), cum_weights=ACUMULADO_HORAS, k=n)
+        for indice, hora in zip(indices, horas):
+            unidades = 1 if rng.random() < 0.7 else rng.randint(2, 4)
+            dia = medianoches[rng.randrange(len(zonas))][rng.randrange(dias)]
+            fecha = dia + timedelta(seconds=hora * 3600 + rng.randrange(3600))
+            if fecha > ahora:
+                # Horas de hoy que aún no pasan: se mueven una semana atrás
+                fecha -= timedelta(days=7)
+            yield (ids_productos[indice], rng.choice(usuario_ids), unidades, precios[indice] * unidades, fecha)
+
+
+def insertar_ventas(filas, batch_size=5000):
+    """
+    Inserta las filas de filas_ventas con COPY (PostgreSQL) o INSERT por lotes (executemany).
+    No usa bulk_create: auto_now_add de Venta.fecha pisaría las fechas generadas.
+    """
+    if connection.vendor == 'postgresql':
+        return _copiar_ventas(filas)
+
+    opts = Venta._meta
+    campos = [opts.get_field(nombre) for nombre in COLUMNAS_VENTAS]
+    sql = (
+        f'INSERT INTO {connection.ops.quote_name(opts.db_table)} '
+        f'({", ".join(connection.ops.quote_name(campo.column) for campo in campos)}) '
+        f'VALUES ({", ".join(["%s"] * len(campos))})'
+    )
+    total = 0
+    with connection.cursor() as cursor:
+        for lote in en_lotes(filas, batch_size):
+            # get_db_prep_save adapta cada valor como lo haría el ORM (sin pre_save)
+            cursor.executemany(sql, [
+                [campo.get_db_prep_save(valor, connection) for campo, valor in zip(campos, fila)]
+                for fila in lote
+            ])
+            total += len(lote)
+    return total
+
+
+def crear_ventas(rng, cantidad, productos, usuario_ids, dias=90, zonas=None):
+    """
+    Ventas repartidas en los últimos `dias` días.
+    No pasa por Venta.save: no descuenta inventario ni llena VentaDiaria
+    (después hay que correr reconstruir_ventas_diarias).
+    """
+    return insertar_ventas(filas_ventas(rng, cantidad, productos, usuario_ids, dias, zonas))
+
+
+# ============================================
+# COPY (PostgreSQL)
+# ============================================
+
+class _LectorLineas:
+    """Archivo de solo lectura sobre un generador de líneas (para copy_expert de psycopg2)"""
+
+    def __init__(self, lineas):
+        self.lineas = lineas
+        self.resto = ''
+
+    def read(self, size=-1):
+        partes = [self.resto]
+        largo = len(self.resto)
+        for linea in self.lineas:
+            partes.append(linea)
+            largo += len(linea)
+            if 0 <= size <= largo:
+                break
+        datos = ''.join(partes)
+        if size < 0:
+            self.resto = ''
+            return datos
+        self.resto = datos[size:]
+        return datos[:size]
+
+
+def _copiar_ventas(filas):
+    opts = Venta._meta
+    columnas = [opts.get_field(nombre).column for nombre in COLUMNAS_VENTAS]
+    sql = f'COPY {opts.db_table} ({", ".join(columnas)}) FROM STDIN'
+
+    contador = {'filas': 0}
+
+    def lineas():
+        for producto_id, usuario_id, unidades, importe, fecha in filas:
+            contador['filas'] += 1
+            yield f'{producto_id}\t{usuario_id}\t{unidades}\t{importe}\t{fecha.isoformat()}\n'
+
+    with connection.cursor() as cursor:
+        crudo = cursor.cursor
+        if hasattr(crudo, 'copy_expert'):
+            # psycopg2
+            crudo.copy_expert(sql, _LectorLineas(lineas()))
+        else:
+            # psycopg 3
+            with crudo.copy(sql) as copia:
+                for bloque in en_lotes(lineas(), 1000):
+                    copia.write(''.join(bloque))
+    return contador['filas']
@@ -0,0 +1,67 @@
+import csv
+import json
+
+from django.utils import timezone
+
+from .models import Venta
+
+
+# Exportación de ventas en streaming
+# Las filas se leen por bloques con un cursor del servidor y se escriben una a una,
+# así la memoria no crece con la cantidad de ventas y el primer byte sale enseguida
+
+COLUMNAS = ['id', 'fecha', 'producto', 'tipo', 'usuario', 'cantidad', 'total', 'pedido']
+
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def filas_ventas(inicio=None, fin=None, chunk_size=2000):
+    """Recorre las ventas del rango [inicio, fin) como tuplas, sin crear objetos del modelo"""
+    ventas = Venta.objects.all()
+    if inicio:
+        ventas = ventas.filter(fecha__gte=inicio)
+    if fin:
+        ventas = ventas.filter(fecha__lt=fin)
+    return ventas.order_by('fecha', 'pk').values_list(
+        'id', 'fecha', 'producto__nombre', 'producto__tipo',
+        'usuario__username', 'cantidad', 'total', 'pedido_id'
+    ).iterator(chunk_size=chunk_size)
+
+
+class _Eco:
+    """Objeto tipo archivo que devuelve lo que se le escribe (para csv.writer)"""
+    def write(self, valor):
+        return valor
+
+
+def generar_csv(filas):
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(COLUMNAS)
+    for fila in filas:
+        id_, fecha, producto, tipo, usuario, cantidad, total, pedido = fila
+        yield escritor.writerow([id_, timezone.localtime(fecha).isoformat(), producto, tipo, usuario, cantidad, total, pedido or ''])
+
+
+def generar_ndjson(filas):
+    for fila in filas:
+        id_, fecha, producto, tipo, usuario, cantidad, total, pedido = fila
+        yield json.dumps({
+            'id': id_,
+            'fecha': timezone.localtime(fecha).isoformat(),
+            'producto': producto,
+            'tipo': tipo,
+            'usuario': usuario,
+            'cantidad': cantidad,
+            'total': str(total),
+            'pedido': pedido,
+        }, ensure_ascii=False) + '\n'
+
+
+def generar_exportacion(formato, filas):
+    """Devuelve el generador de líneas para el formato pedido ('csv' o 'ndjson')"""
+    if formato == 'ndjson':
+        return generar_ndjson(filas)
+    return generar_csv(filas)
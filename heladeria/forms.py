@@ -40,6 +40,12 @@ class IngredienteForm(forms.ModelForm):
             'es_sano': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
             'sabor': forms.TextInput(attrs={'class': 'form-control'}),
         }
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # En un ingrediente fragmentado se edita el stock total (ver Ingrediente.save)
+        if self.instance.pk and self.instance.fragmentos:
+            self.initial['inventario'] = self.instance.existencias()
 
 
 # Formulario para crear/editar productos
@@ -66,8 +72,10 @@ class ProductoForm(forms.ModelForm):
     def clean_ingredientes(self):
         """Validar que se seleccionen exactamente 3 ingredientes"""
         ingredientes = self.cleaned_data.get('ingredientes')
-        if ingredientes and ingredientes.count() != 3:
-            raise forms.ValidationError('Debes seleccionar exactamente 3 ingredientes.')
+        if ingredientes and ingredientes.count() != Producto.NUM_INGREDIENTES:
+            raise forms.ValidationError(
+                f'Debes seleccionar exactamente {Producto.NUM_INGREDIENTES} ingredientes.'
+            )
         return ingredientes
 
 
@@ -80,3 +88,36 @@ class VentaForm(forms.ModelForm):
             'producto': forms.Select(attrs={'class': 'form-control'}),
             'cantidad': forms.NumberInput(attrs={'class': 'form-control', 'min': '1', 'value': '1'}),
         }
+
+
+# Formulario para una línea de un pedido (producto + cantidad)
+class LineaPedidoForm(forms.Form):
+    producto = forms.ModelChoiceField(
+        queryset=Producto.objects.all(),
+        widget=forms.Select(attrs={'class': 'form-control'}),
+        label='Producto'
+    )
+    cantidad = forms.IntegerField(
+        min_value=1,
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'min': '1'}),
+        label='Cantidad'
+    )
+
+
+class BaseLineaPedidoFormSet(forms.BaseFormSet):
+    def clean(self):
+        """Validar que el pedido tenga al menos un producto"""
+        super().clean()
+        if any(self.errors):
+            return
+        lineas = [form.cleaned_data for form in self.forms if form.cleaned_data]
+        if not lineas:
+            raise forms.ValidationError('Agrega al menos un producto al pedido.')
+
+
+# Conjunto de formularios para armar un pedido con varios productos
+LineaPedidoFormSet = forms.formset_factory(
+    LineaPedidoForm,
+    formset=BaseLineaPedidoFormSet,
+    extra=5
+)
@@ -0,0 +1,187 @@
+import asyncio
+import importlib
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncClient, Client, RequestFactory, override_settings
+from django.urls import clear_url_caches, reverse
+
+from heladeria import urls, views
+from heladeria.models import Producto
+
+
+# Caché de base de datos (la compartida de CACHE_DB=True) para --cache db
+CACHE_DB = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'heladeria_cache',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+
+
+@contextmanager
+def rutas_catalogo(asincronas):
+    """Enruta el catálogo a las vistas síncronas o asíncronas (como CATALOGO_ASYNC)"""
+    def recargar(valor):
+        with override_settings(CATALOGO_ASYNC=valor):
+            importlib.reload(urls)
+        # El include() de la raíz guarda los patrones: también se recarga
+        importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+        clear_url_caches()
+
+    original = settings.CATALOGO_ASYNC
+    recargar(asincronas)
+    try:
+        yield
+    finally:
+        recargar(original)
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide cuántos lectores concurrentes del catálogo atiende un proceso, '
+        'con las vistas síncronas (WSGI) y asíncronas (ASGI)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrencia', type=int, nargs='+', default=[1, 8, 32, 128])
+        parser.add_argument('--duracion', type=float, default=3.0, help='Segundos por medición')
+        parser.add_argument(
+            '--vista', choices=['home', 'producto_lista', 'producto_detalle'], default='producto_lista'
+        )
+        parser.add_argument(
+            '--pila', action='store_true',
+            help='Peticiones por la pila completa (URLs y middlewares) con Client y AsyncClient, '
+                 'en vez de llamar a la vista directamente',
+        )
+        parser.add_argument(
+            '--cache', choices=['configurada', 'db'], default='configurada',
+            help='db: caché en la base de datos (CACHE_DB=True) durante la medición',
+        )
+
+    def handle(self, *args, **options):
+        producto = Producto.objects.order_by('pk').first()
+        if options['vista'] == 'producto_detalle' and producto is None:
+            raise CommandError('No hay productos para medir producto_detalle.')
+
+        kwargs = {'pk': producto.pk} if options['vista'] == 'producto_detalle' else {}
+        with ExitStack() as pila:
+            if options['cache'] == 'db':
+                pila.enter_context(override_settings(CACHES=CACHE_DB))
+                call_command('createcachetable', verbosity=0)
+            if options['pila']:
+                self.medir_pila(options, reverse(options['vista'], kwargs=kwargs))
+            else:
+                self.medir_vistas(options, kwargs)
+
+    def medir_vistas(self, options, kwargs):
+        """Llama a las vistas directamente (sin middlewares ni enrutamiento)"""
+        factory = RequestFactory()
+        vista_sync = getattr(views, options['vista'])
+        vista_async = getattr(views, f"{options['vista']}_async")
+
+        def nueva_peticion():
+            request = factory.get('/')
+            request.user = AnonymousUser()
+            return request
+
+        self.stdout.write(
+            f"Vista: {options['vista']} | caché {options['cache']} | {options['duracion']} s por medición"
+        )
+        self.stdout.write(f"{'modo':<6} {'lectores':>8} {'req/s':>10} {'p50 ms':>8} {'p95 ms':>8}")
+
+        for concurrencia in options['concurrencia']:
+            for modo in ('wsgi', 'asgi'):
+                if modo == 'wsgi':
+                    latencias = self.medir_sync(vista_sync, nueva_peticion, kwargs, concurrencia, options['duracion'])
+                else:
+                    latencias = asyncio.run(
+                        self.medir_async(vista_async, nueva_peticion, kwargs, concurrencia, options['duracion'])
+                    )
+                self.reportar(modo, concurrencia, latencias, options['duracion'])
+
+    def medir_pila(self, options, url):
+        """
+        Peticiones por la pila completa: WSGI con Client (un hilo por lector) y ASGI con
+        AsyncClient (un event loop), con el catálogo enrutado a las vistas correspondientes
+        """
+        self.stdout.write(
+            f"Vista: {options['vista']} ({url}) por la pila completa | caché {options['cache']} "
+            f"| {options['duracion']} s por medición"
+        )
+        self.stdout.write(f"{'modo':<6} {'lectores':>8} {'req/s':>10} {'p50 ms':>8} {'p95 ms':>8}")
+
+        for concurrencia in options['concurrencia']:
+            for modo in ('wsgi', 'asgi'):
+                with rutas_catalogo(modo == 'asgi'):
+                    if modo == 'wsgi':
+                        latencias = self.medir_sync(
+                            lambda peticion: self.verificar(Client().get(peticion, secure=True)), lambda: url, {},
+                            concurrencia, options['duracion'],
+                        )
+                    else:
+                        latencias = asyncio.run(self.medir_async_pila(url, concurrencia, options['duracion']))
+                self.reportar(modo, concurrencia, latencias, options['duracion'])
+
+    async def medir_async_pila(self, url, concurrencia, duracion):
+        async def vista(peticion):
+            self.verificar(await AsyncClient().get(peticion, secure=True))
+
+        return await self.medir_async(vista, lambda: url, {}, concurrencia, duracion)
+
+    @staticmethod
+    def verificar(respuesta):
+        if respuesta.status_code != 200:
+            raise CommandError(f'La vista respondió {respuesta.status_code}.')
+
+    def medir_sync(self, vista, nueva_peticion, kwargs, concurrencia, duracion):
+        """Un hilo por lector, como los threads de un worker WSGI"""
+        limite = time.perf_counter() + duracion
+
+        def lector():
+            latencias = []
+            try:
+                while time.perf_counter() < limite:
+                    inicio = time.perf_counter()
+                    vista(nueva_peticion(), **kwargs)
+                    latencias.append(time.perf_counter() - inicio)
+            finally:
+                connection.close()
+            return latencias
+
+        with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+            resultados = list(pool.map(lambda _: lector(), range(concurrencia)))
+        return [latencia for resultado in resultados for latencia in resultado]
+
+    async def medir_async(self, vista, nueva_peticion, kwargs, concurrencia, duracion):
+        """Una tarea por lector en un solo event loop, como un worker ASGI"""
+        limite = time.perf_counter() + duracion
+
+        async def lector():
+            latencias = []
+            while time.perf_counter() < limite:
+                inicio = time.perf_counter()
+                await vista(nueva_peticion(), **kwargs)
+                latencias.append(time.perf_counter() - inicio)
+            return latencias
+
+        resultados = await asyncio.gather(*(lector() for _ in range(concurrencia)))
+        return [latencia for resultado in resultados for latencia in resultado]
+
+    def reportar(self, modo, concurrencia, latencias, duracion):
+        if not latencias:
+            self.stdout.write(f'{modo:<6} {concurrencia:>8} {"sin datos":>10}')
+            return
+        cuantiles = statistics.quantiles(latencias, n=20) if len(latencias) > 1 else latencias * 19
+        self.stdout.write(
+            f'{modo:<6} {concurrencia:>8} {len(latencias) / duracion:>10.1f} '
+            f'{statistics.median(latencias) * 1000:>8.2f} {cuantiles[18] * 1000:>8.2f}'
+        )
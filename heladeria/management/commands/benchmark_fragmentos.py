@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from heladeria.management.commands.estres_ventas import base_de_prueba, simular_ventas, verificar_simulacion
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara ventas por segundo con un solo contador de inventario y con contadores '
+        'fragmentados, para varios niveles de compradores concurrentes. '
+        'Corre sobre una base de datos de prueba que se crea y se borra. '
+        'Medir en PostgreSQL: SQLite serializa las escrituras.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrencia', type=int, nargs='+', default=[8, 32, 128])
+        parser.add_argument('--fragmentos', type=int, default=16)
+        parser.add_argument('--ventas', type=int, default=20, help='Intentos de venta por comprador')
+
+    def handle(self, *args, **options):
+        with base_de_prueba():
+            self.medir(options)
+
+    def medir(self, options):
+        self.stdout.write(
+            f"{'compradores':>11} {'fragmentos':>10} {'ventas/s':>10} {'exitosas':>9} {'errores':>8}"
+        )
+        for concurrencia in options['concurrencia']:
+            for fragmentos in (0, options['fragmentos']):
+                # Inventario de sobra: se mide la contención, no el agotamiento
+                inventario = concurrencia * options['ventas']
+                datos = simular_ventas(concurrencia, options['ventas'], inventario, fragmentos)
+                verificar_simulacion(datos, inventario)
+                self.stdout.write(
+                    f"{concurrencia:>11} {fragmentos:>10} {datos['exitosas'] / datos['segundos']:>10.1f} "
+                    f"{datos['exitosas']:>9} {datos['errores']:>8}"
+                )
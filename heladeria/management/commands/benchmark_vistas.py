@@ -0,0 +1,228 @@
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import time
+from io import StringIO
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+
+from heladeria import datos_sinteticos
+from heladeria.models import Producto, Usuario
+
+
+# Tamaños de datos: cantidad de filas de cada tabla
+TAMANOS = {
+    'pequeno': {'ingredientes': 30, 'productos': 20, 'clientes': 20, 'ventas': 500},
+    'mediano': {'ingredientes': 150, 'productos': 100, 'clientes': 200, 'ventas': 10_000},
+    'grande': {'ingredientes': 600, 'productos': 400, 'clientes': 1_000, 'ventas': 100_000},
+}
+
+# Vistas medidas: (nombre, rol del usuario, método)
+VISTAS = [
+    ('home', None, 'get'),
+    ('producto_lista', 'CLIENTE', 'get'),
+    ('producto_detalle', 'CLIENTE', 'get'),
+    ('venta_crear', 'CLIENTE', 'post'),
+    ('venta_lista', 'ADMINISTRADOR', 'get'),
+    ('mis_compras', 'CLIENTE', 'get'),
+    ('producto_rentable', 'ADMINISTRADOR', 'get'),
+]
+
+METODOS = ['calcular_costo', 'calcular_calorias', 'calcular_rentabilidad', 'hay_inventario_disponible']
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide las vistas principales y los métodos calcular_* de Producto con datos '
+        'pequeños, medianos y grandes. Usa una base de datos de prueba (no toca tus datos) '
+        'y guarda los resultados en JSON para comparar entre commits.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanos', nargs='+', choices=list(TAMANOS), default=list(TAMANOS))
+        parser.add_argument('--repeticiones', type=int, default=20, help='Peticiones por vista')
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--salida', default='benchmark_resultados.json')
+        parser.add_argument('--comparar', default=None, help='JSON de una corrida anterior')
+        parser.add_argument(
+            '--tolerancia', type=float, default=0.25,
+            help='Aumento relativo de la mediana que se considera regresión (0.25 = 25%%)'
+        )
+
+    def handle(self, *args, **options):
+        # Sin una línea de log por petición mientras se mide
+        logging.getLogger('heladeria.medicion').setLevel(logging.ERROR)
+
+        setup_test_environment()
+        nombre_original = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            resultados = {
+                tamano: self.medir_tamano(tamano, options)
+                for tamano in options['tamanos']
+            }
+        finally:
+            connection.creation.destroy_test_db(nombre_original, verbosity=0)
+            teardown_test_environment()
+
+        informe = {
+            'commit': self.commit_actual(),
+            'fecha': timezone.now().isoformat(),
+            'entorno': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'base_datos': connection.vendor,
+            },
+            'repeticiones': options['repeticiones'],
+            'semilla': options['semilla'],
+            'resultados': resultados,
+        }
+        Path(options['salida']).write_text(json.dumps(informe, indent=2, ensure_ascii=False))
+        self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {options['salida']}"))
+
+        if options['comparar']:
+            self.comparar(options['comparar'], informe, options['tolerancia'])
+
+    # ============================================
+    # DATOS
+    # ============================================
+
+    def poblar(self, tamano, semilla):
+        call_command('flush', interactive=False, verbosity=0)
+        cache.clear()
+        cantidades = TAMANOS[tamano]
+        rng = random.Random(semilla)
+
+        ingredientes = datos_sinteticos.crear_ingredientes(rng, cantidades['ingredientes'])
+        productos = datos_sinteticos.crear_productos(rng, cantidades['productos'], ingredientes)
+        clientes = datos_sinteticos.crear_usuarios(cantidades['clientes'])
+        datos_sinteticos.crear_ventas(rng, cantidades['ventas'], productos, clientes)
+        # Las ventas sintéticas no pasan por Venta.save: el resumen diario se arma aparte
+        call_command('reconstruir_ventas_diarias', stdout=StringIO())
+
+        password = make_password('benchmark')
+        usuarios = {
+            'CLIENTE': Usuario.objects.get(pk=clientes[0]),
+            'ADMINISTRADOR': Usuario.objects.create(
+                username='benchmark_admin', password=password, rol='ADMINISTRADOR'
+            ),
+        }
+        return productos, usuarios
+
+    # ============================================
+    # MEDICIÓN
+    # ============================================
+
+    def medir_tamano(self, tamano, options):
+        self.stdout.write(f'\n== {tamano}: {TAMANOS[tamano]}')
+        productos, usuarios = self.poblar(tamano, options['semilla'])
+        producto = productos[0]
+
+        resultado = {'vistas': {}, 'metodos': {}}
+        for nombre, rol, metodo in VISTAS:
+            client = Client()
+            if rol:
+                client.force_login(usuarios[rol])
+            kwargs = {'pk': producto.pk} if nombre == 'producto_detalle' else {}
+            url = reverse(nombre, kwargs=kwargs)
+            datos = {'producto': producto.pk, 'cantidad': 1} if metodo == 'post' else None
+
+            def peticion():
+                respuesta = getattr(client, metodo)(url, datos)
+                if respuesta.status_code >= 400:
+                    raise CommandError(f'{nombre} respondió {respuesta.status_code}')
+                return respuesta
+
+            resultado['vistas'][nombre] = self.medir(peticion, options['repeticiones'])
+            self.reportar(nombre, resultado['vistas'][nombre])
+
+        # Métodos del modelo sobre objetos recién cargados (sin ingredientes precargados)
+        muestra = [p.pk for p in productos[:options['repeticiones']]]
+        for metodo in METODOS:
+            objetos = iter(list(Producto.objects.filter(pk__in=muestra)))
+
+            def llamada():
+                getattr(next(objetos), metodo)()
+
+            resultado['metodos'][metodo] = self.medir(llamada, len(muestra), calentar=False)
+            self.reportar(f'Producto.{metodo}', resultado['metodos'][metodo])
+        return resultado
+
+    def medir(self, funcion, repeticiones, calentar=True):
+        """Mediana, p95 y consultas por llamada (tras una llamada de calentamiento)"""
+        if calentar:
+            funcion()
+        tiempos = []
+        consultas = []
+        for _ in range(repeticiones):
+            with CaptureQueriesContext(connection) as capturadas:
+                inicio = time.perf_counter()
+                funcion()
+                tiempos.append(time.perf_counter() - inicio)
+            consultas.append(len(capturadas))
+        cuantiles = statistics.quantiles(tiempos, n=20) if len(tiempos) > 1 else tiempos * 19
+        return {
+            'mediana_ms': round(statistics.median(tiempos) * 1000, 3),
+            'p95_ms': round(cuantiles[18] * 1000, 3),
+            'min_ms': round(min(tiempos) * 1000, 3),
+            'consultas': max(consultas),
+        }
+
+    def reportar(self, nombre, datos):
+        self.stdout.write(
+            f"  {nombre:<36} mediana {datos['mediana_ms']:>9.2f} ms  "
+            f"p95 {datos['p95_ms']:>9.2f} ms  consultas {datos['consultas']:>3}"
+        )
+
+    # ============================================
+    # COMPARACIÓN ENTRE COMMITS
+    # ============================================
+
+    def comparar(self, ruta, informe, tolerancia):
+        anterior = json.loads(Path(ruta).read_text())
+        self.stdout.write(f"\nComparación con {anterior.get('commit', '?')} ({ruta}):")
+        regresiones = []
+        for tamano, actual in informe['resultados'].items():
+            previo = anterior['resultados'].get(tamano)
+            if previo is None:
+                continue
+            for grupo in ('vistas', 'metodos'):
+                for nombre, datos in actual[grupo].items():
+                    antes = previo[grupo].get(nombre)
+                    if antes is None:
+                        continue
+                    cambio = (datos['mediana_ms'] - antes['mediana_ms']) / antes['mediana_ms'] if antes['mediana_ms'] else 0
+                    marca = ''
+                    if cambio > tolerancia or datos['consultas'] > antes['consultas']:
+                        marca = '  <-- REGRESIÓN'
+                        regresiones.append(f'{tamano}/{nombre}')
+                    self.stdout.write(
+                        f"  {tamano:<8} {nombre:<28} {antes['mediana_ms']:>9.2f} -> {datos['mediana_ms']:>9.2f} ms "
+                        f"({cambio:+.0%})  consultas {antes['consultas']} -> {datos['consultas']}{marca}"
+                    )
+        if regresiones:
+            raise CommandError(f"Regresiones: {', '.join(regresiones)}")
+        self.stdout.write(self.style.SUCCESS('Sin regresiones.'))
+
+    def commit_actual(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from heladeria.models import InventarioCheckpoint, InventarioMovimiento
+from heladeria.periodos import inicio_del_dia
+
+
+class Command(BaseCommand):
+    help = (
+        'Resume los movimientos de inventario anteriores a N días en puntos de control '
+        'diarios (uno por ingrediente y día con movimientos) y borra esos movimientos'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=90, help='Conservar el detalle de los últimos N días')
+
+    def handle(self, *args, **options):
+        if options['dias'] < 1:
+            raise CommandError('--dias debe ser al menos 1.')
+        # Medianoche local: los puntos de control quedan al final de cada día completo
+        corte = inicio_del_dia(timezone.localdate() - timedelta(days=options['dias']))
+        viejos = InventarioMovimiento.objects.filter(fecha__lt=corte)
+
+        with transaction.atomic():
+            # Suma por ingrediente y día local, directamente en la base de datos
+            deltas = (
+                viejos.annotate(dia=TruncDate('fecha'))
+                .values('ingrediente_id', 'dia')
+                .annotate(delta=Sum('cantidad'))
+                .order_by('ingrediente_id', 'dia')
+            )
+
+            # Saldo de partida: último punto de control de cada ingrediente antes del corte
+            saldos = {}
+            for ingrediente_id, saldo in (
+                InventarioCheckpoint.objects.filter(fecha__lt=corte)
+                .order_by('ingrediente_id', 'fecha').values_list('ingrediente_id', 'saldo')
+            ):
+                saldos[ingrediente_id] = saldo
+
+            nuevos = []
+            for fila in deltas.iterator():
+                ingrediente_id = fila['ingrediente_id']
+                saldos[ingrediente_id] = saldos.get(ingrediente_id, 0) + fila['delta']
+                nuevos.append(InventarioCheckpoint(
+                    ingrediente_id=ingrediente_id,
+                    # Saldo al final del día = antes de la medianoche siguiente
+                    fecha=inicio_del_dia(fila['dia'] + timedelta(days=1)),
+                    saldo=saldos[ingrediente_id],
+                ))
+
+            InventarioCheckpoint.objects.bulk_create(nuevos, batch_size=1000)
+            borrados, _ = viejos.delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{borrados} movimientos anteriores al {corte:%Y-%m-%d} resumidos en {len(nuevos)} puntos de control.'
+        ))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from heladeria.models import Ingrediente, InventarioMovimiento
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara el inventario de cada ingrediente con el stock según el libro de movimientos. '
+        'Con --corregir anota un AJUSTE para cada diferencia.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corregir', action='store_true')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            ingredientes = (
+                Ingrediente.objects.con_stock_al().con_existencias()
+                .select_for_update(of=('self',))
+                .values_list('pk', 'nombre', 'existencias', 'stock_al')
+                .order_by('nombre')
+            )
+            diferencias = [fila for fila in ingredientes if fila[2] != fila[3]]
+
+            for _, nombre, inventario, stock_libro in diferencias:
+                self.stdout.write(f'{nombre}: inventario {inventario}, libro {stock_libro} ({inventario - stock_libro:+d})')
+
+            if diferencias and options['corregir']:
+                InventarioMovimiento.objects.registrar_ajustes(
+                    (pk, stock_libro, inventario) for pk, _, inventario, stock_libro in diferencias
+                )
+                self.stdout.write(self.style.SUCCESS(f'{len(diferencias)} ajustes anotados en el libro.'))
+                return
+
+        if diferencias:
+            raise CommandError(f'{len(diferencias)} ingredientes no cuadran con el libro (usa --corregir).')
+        self.stdout.write(self.style.SUCCESS('El inventario cuadra con el libro de movimientos.'))
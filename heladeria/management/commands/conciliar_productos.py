@@ -0,0 +1,53 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from heladeria.cache import invalidar_catalogo
+from heladeria.models import Producto
+
+
+CENTAVO = Decimal('0.01')
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara costo, calorias_totales y disponible guardados en cada producto con los '
+        'calculados desde sus ingredientes. Con --corregir recalcula los que no cuadran.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corregir', action='store_true')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            productos = (
+                Producto.objects.select_for_update().con_calculados()
+                .values_list('pk', 'nombre', 'costo', 'costo_calculado', 'calorias_totales',
+                             'calorias_calculadas', 'disponible', 'disponible_calculado')
+                .order_by('nombre')
+            )
+            diferencias = []
+            for pk, nombre, costo, costo_real, calorias, calorias_real, disponible, disponible_real in productos:
+                # La suma de decimales puede volver como float (SQLite): se compara al centavo
+                costo_real = Decimal(str(costo_real)).quantize(CENTAVO)
+                problemas = []
+                if costo != costo_real:
+                    problemas.append(f'costo {costo} (real {costo_real})')
+                if calorias != calorias_real:
+                    problemas.append(f'calorías {calorias} (real {calorias_real})')
+                if disponible != bool(disponible_real):
+                    problemas.append(f'disponible {disponible} (real {bool(disponible_real)})')
+                if problemas:
+                    diferencias.append(pk)
+                    self.stdout.write(f'{nombre}: {", ".join(problemas)}')
+
+            if diferencias and options['corregir']:
+                Producto.objects.filter(pk__in=diferencias).recalcular_receta()
+                transaction.on_commit(invalidar_catalogo)
+                self.stdout.write(self.style.SUCCESS(f'{len(diferencias)} productos recalculados.'))
+                return
+
+        if diferencias:
+            raise CommandError(f'{len(diferencias)} productos no cuadran con sus ingredientes (usa --corregir).')
+        self.stdout.write(self.style.SUCCESS('Costo, calorías y disponibilidad cuadran en todos los productos.'))
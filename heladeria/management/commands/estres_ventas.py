@@ -0,0 +1,197 @@
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from django.db.models import Sum
+from django.test.utils import override_settings
+
+from heladeria.models import (
+    FragmentoInventario, Ingrediente, InventarioInsuficiente, Producto, Usuario, Venta
+)
+
+
+# Segundos máximos para que todos los compradores abran su conexión y arranquen juntos
+ESPERA_ARRANQUE = 60
+
+CACHE_PRUEBA = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'heladeria-estres',
+    }
+}
+
+
+@contextmanager
+def base_de_prueba():
+    """
+    Crea una base de datos de prueba vacía y la borra al salir (como benchmark_vistas),
+    para que las ventas simuladas no toquen la base real, su catálogo ni su caché
+    """
+    nombre_original = connection.settings_dict['NAME']
+    prueba = connection.settings_dict['TEST']
+    nombre_prueba = prueba['NAME']
+    if connection.vendor == 'sqlite' and not nombre_prueba:
+        # La base de prueba de SQLite en memoria bloquea por tabla y no espera: cada venta
+        # simultánea fallaría. En un archivo temporal los hilos esperan como en la base real
+        prueba['NAME'] = os.path.join(tempfile.gettempdir(), f'heladeria-estres-{uuid.uuid4().hex[:8]}.sqlite3')
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        # Caché propia: las invalidaciones de las señales no llegan a la caché real
+        with override_settings(CACHES=CACHE_PRUEBA):
+            yield
+    finally:
+        connection.creation.destroy_test_db(nombre_original, verbosity=0)
+        prueba['NAME'] = nombre_prueba
+
+
+def simular_ventas(hilos, ventas_por_hilo, inventario_inicial, fragmentos=0):
+    """
+    Lanza `hilos` compradores concurrentes sobre un producto temporal de 3 ingredientes
+    (con `fragmentos` > 0 los ingredientes usan contadores fragmentados).
+    Devuelve los resultados, el tiempo y lo que quedó en la base de datos.
+    """
+    # Datos temporales con nombres únicos (se borran al terminar cada simulación)
+    sufijo = uuid.uuid4().hex[:8]
+    ingredientes = [
+        Ingrediente.objects.create(
+            nombre=f'estres-{sufijo}-{i}',
+            precio=Decimal('1.00'),
+            calorias=100,
+            inventario=inventario_inicial,
+            tipo='BASE' if i == 0 else 'COMPLEMENTO',
+        )
+        for i in range(3)
+    ]
+    ids = [ingrediente.pk for ingrediente in ingredientes]
+    if fragmentos:
+        for ingrediente_id in ids:
+            FragmentoInventario.objects.configurar(ingrediente_id, fragmentos)
+    producto = Producto.objects.create(
+        nombre=f'estres-{sufijo}', precio_publico=Decimal('5.00'), tipo='COPA'
+    )
+    producto.ingredientes.set(ingredientes)
+    usuario = Usuario.objects.create_user(username=f'estres-{sufijo}', password=None)
+
+    resultados = {'exitosas': 0, 'sin_stock': 0, 'errores': 0}
+    fallos_conexion = []
+    candado = threading.Lock()
+    # Todos los hilos arrancan juntos (la conexión de cada uno ya está abierta)
+    salida = threading.Barrier(hilos + 1)
+
+    def comprador():
+        try:
+            try:
+                connection.ensure_connection()
+                salida.wait(ESPERA_ARRANQUE)
+            except DatabaseError as error:
+                # Por ejemplo más compradores que max_connections en PostgreSQL:
+                # se rompe la barrera para que nadie se quede esperando
+                salida.abort()
+                with candado:
+                    fallos_conexion.append(error)
+                return
+            except threading.BrokenBarrierError:
+                return
+            for _ in range(ventas_por_hilo):
+                try:
+                    Venta(producto=producto, usuario=usuario, cantidad=1, total=producto.precio_publico).save()
+                    clave = 'exitosas'
+                except InventarioInsuficiente:
+                    clave = 'sin_stock'
+                except DatabaseError:
+                    # Por ejemplo "database is locked" en SQLite: la venta no se registra
+                    clave = 'errores'
+                with candado:
+                    resultados[clave] += 1
+        finally:
+            connection.close()
+
+    try:
+        threads = [threading.Thread(target=comprador) for _ in range(hilos)]
+        for thread in threads:
+            thread.start()
+        try:
+            salida.wait(ESPERA_ARRANQUE)
+        except threading.BrokenBarrierError:
+            for thread in threads:
+                thread.join()
+            if fallos_conexion:
+                raise CommandError(
+                    f'{len(fallos_conexion)} de {hilos} compradores no pudieron conectarse '
+                    f'a la base de datos: {fallos_conexion[0]}'
+                )
+            raise CommandError(f'Los compradores no arrancaron en {ESPERA_ARRANQUE} s.')
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        segundos = time.perf_counter() - inicio
+
+        vendidas = Venta.objects.filter(producto=producto).aggregate(total=Sum('cantidad'))['total'] or 0
+        existencias = list(
+            Ingrediente.objects.filter(pk__in=ids).con_existencias().values_list('existencias', flat=True)
+        )
+        # Stock según el libro de movimientos (punto de control + movimientos)
+        libro = list(Ingrediente.objects.con_stock_al().filter(pk__in=ids).values_list('stock_al', flat=True))
+        disponible = Producto.objects.values_list('disponible', flat=True).get(pk=producto.pk)
+    finally:
+        producto.delete()
+        Ingrediente.objects.filter(pk__in=ids).delete()
+        usuario.delete()
+
+    return {
+        **resultados,
+        'segundos': segundos,
+        'vendidas': vendidas,
+        'existencias': existencias,
+        'libro': libro,
+        'disponible': disponible,
+    }
+
+
+def verificar_simulacion(datos, inventario_inicial):
+    """Invariantes: ninguna venta perdida y ningún ingrediente sobrevendido"""
+    if datos['vendidas'] != datos['exitosas']:
+        raise CommandError('Se perdieron ventas: lo registrado no coincide con lo confirmado.')
+    for existencias in datos['existencias']:
+        if existencias < 0 or inventario_inicial - existencias != datos['vendidas']:
+            raise CommandError('El inventario no coincide con las ventas registradas.')
+    if sorted(datos['libro']) != sorted(datos['existencias']):
+        raise CommandError(f"El libro de movimientos no cuadra con el inventario: {datos['libro']}")
+    if datos['disponible'] != all(existencias > 0 for existencias in datos['existencias']):
+        raise CommandError('Producto.disponible no coincide con el inventario de sus ingredientes.')
+
+
+class Command(BaseCommand):
+    help = (
+        'Prueba de estrés: ventas concurrentes sin perder ni sobrevender inventario. '
+        'Corre sobre una base de datos de prueba que se crea y se borra.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hilos', type=int, default=8, help='Compradores concurrentes')
+        parser.add_argument('--ventas', type=int, default=50, help='Intentos de venta por hilo')
+        parser.add_argument('--inventario', type=int, default=200, help='Inventario inicial de cada ingrediente')
+        parser.add_argument(
+            '--fragmentos', type=int, default=0,
+            help='Fragmentos de inventario por ingrediente (0 = un solo contador)'
+        )
+
+    def handle(self, *args, **options):
+        hilos = options['hilos']
+        with base_de_prueba():
+            datos = simular_ventas(hilos, options['ventas'], options['inventario'], options['fragmentos'])
+
+        self.stdout.write(
+            f"Intentos: {hilos * options['ventas']} | Exitosas: {datos['exitosas']} | "
+            f"Sin stock: {datos['sin_stock']} | Errores: {datos['errores']}"
+        )
+        self.stdout.write(f"Vendidas en BD: {datos['vendidas']} | Inventario final: {datos['existencias']}")
+
+        verificar_simulacion(datos, options['inventario'])
+        self.stdout.write(self.style.SUCCESS('Sin ventas perdidas ni sobreventa.'))
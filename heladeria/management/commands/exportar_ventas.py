@@ -0,0 +1,32 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from heladeria.exportacion import FORMATOS, filas_ventas, generar_exportacion
+from heladeria.periodos import rango_fechas
+
+
+class Command(BaseCommand):
+    help = 'Exporta ventas a CSV o NDJSON en streaming (memoria constante)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', type=date.fromisoformat, default=None, help='Fecha inicial AAAA-MM-DD (incluida)')
+        parser.add_argument('--hasta', type=date.fromisoformat, default=None, help='Fecha final AAAA-MM-DD (incluida)')
+        parser.add_argument('--formato', choices=list(FORMATOS), default='csv')
+        parser.add_argument('--salida', default='-', help='Archivo de salida (por defecto la salida estándar)')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Filas por bloque leídas de la base de datos')
+
+    def handle(self, *args, **options):
+        if options['desde'] and options['hasta'] and options['desde'] > options['hasta']:
+            raise CommandError('--desde no puede ser posterior a --hasta.')
+
+        inicio, fin = rango_fechas(options['desde'], options['hasta'])
+        filas = filas_ventas(inicio, fin, chunk_size=options['chunk_size'])
+        lineas = generar_exportacion(options['formato'], filas)
+
+        if options['salida'] == '-':
+            for linea in lineas:
+                self.stdout.write(linea, ending='')
+        else:
+            with open(options['salida'], 'w', encoding='utf-8', newline='') as archivo:
+                archivo.writelines(lineas)
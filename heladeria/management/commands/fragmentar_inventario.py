@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from heladeria.models import FragmentoInventario, Ingrediente
+from heladeria.cache import invalidar_catalogo
+
+
+class Command(BaseCommand):
+    help = (
+        'Reparte el inventario de los ingredientes indicados en N contadores '
+        '(para ingredientes muy vendidos). --fragmentos 0 vuelve a un solo contador.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('nombres', nargs='+', help='Nombres de los ingredientes')
+        parser.add_argument('--fragmentos', type=int, default=8)
+
+    def handle(self, *args, **options):
+        fragmentos = options['fragmentos']
+        if not 0 <= fragmentos <= 256:
+            raise CommandError('--fragmentos debe estar entre 0 y 256.')
+
+        ingredientes = dict(
+            Ingrediente.objects.filter(nombre__in=options['nombres']).values_list('nombre', 'pk')
+        )
+        faltantes = sorted(set(options['nombres']) - set(ingredientes))
+        if faltantes:
+            raise CommandError(f'No existen los ingredientes: {", ".join(faltantes)}')
+
+        # En orden de id, igual que las ventas (evita bloqueos cruzados)
+        for nombre, pk in sorted(ingredientes.items(), key=lambda item: item[1]):
+            FragmentoInventario.objects.configurar(pk, fragmentos)
+            self.stdout.write(f'{nombre}: {fragmentos or "sin"} fragmentos')
+        invalidar_catalogo()
+        self.stdout.write(self.style.SUCCESS(f'{len(ingredientes)} ingredientes configurados.'))
@@ -0,0 +1,84 @@
+import random
+import time
+from contextlib import contextmanager
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from heladeria import datos_sinteticos
+from heladeria.cache import invalidar_catalogo
+from heladeria.models import Ingrediente, Producto
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera datos sintéticos en volumen (ingredientes, productos, usuarios y ventas) '
+        'para reproducir problemas de rendimiento. Misma semilla = mismos datos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--ingredientes', type=int, default=2_000)
+        parser.add_argument('--productos', type=int, default=300)
+        parser.add_argument('--usuarios', type=int, default=100_000, help='Clientes')
+        parser.add_argument('--empleados', type=int, default=20)
+        parser.add_argument('--ventas', type=int, default=1_000_000)
+        parser.add_argument('--dias', type=int, default=365, help='Las ventas se reparten en los últimos N días')
+        parser.add_argument(
+            '--zonas', nargs='+', default=None,
+            help=f'Zonas horarias de los clientes (por defecto {settings.TIME_ZONE})'
+        )
+        parser.add_argument(
+            '--prefijo', default='sint-',
+            help='Prefijo de nombres y usernames (para no chocar con datos existentes)'
+        )
+
+    def handle(self, *args, **options):
+        prefijo = options['prefijo']
+        if Ingrediente.objects.filter(nombre__startswith=prefijo).exists():
+            raise CommandError(
+                f'Ya hay datos con el prefijo "{prefijo}". Usa otro --prefijo o vacía la base con flush.'
+            )
+        if options['productos'] and options['ingredientes'] < Producto.NUM_INGREDIENTES:
+            raise CommandError('Se necesitan más ingredientes para armar recetas.')
+
+        rng = random.Random(options['semilla'])
+        self.stdout.write(f'Base de datos: {connection.vendor} | semilla {options["semilla"]}')
+
+        with self.paso('Ingredientes'):
+            ingredientes = datos_sinteticos.crear_ingredientes(rng, options['ingredientes'], prefijo=prefijo)
+        with self.paso('Productos y recetas'):
+            productos = datos_sinteticos.crear_productos(rng, options['productos'], ingredientes, prefijo=prefijo)
+        with self.paso('Usuarios'):
+            clientes = datos_sinteticos.crear_usuarios(options['usuarios'], prefijo=f'{prefijo}cliente')
+            datos_sinteticos.crear_usuarios(options['empleados'], prefijo=f'{prefijo}empleado', rol='EMPLEADO')
+
+        if options['ventas']:
+            if not productos or not clientes:
+                raise CommandError('Las ventas necesitan al menos un producto y un cliente.')
+            with self.paso('Ventas'):
+                with transaction.atomic():
+                    creadas = datos_sinteticos.crear_ventas(
+                        rng, options['ventas'], productos, clientes,
+                        dias=options['dias'], zonas=options['zonas'],
+                    )
+                self.stdout.write(f'  {creadas} ventas')
+            with self.paso('Resumen diario (reconstruir_ventas_diarias)'):
+                call_command('reconstruir_ventas_diarias', stdout=StringIO())
+
+        # bulk_create no dispara señales: invalidar el catálogo en caché a mano
+        invalidar_catalogo()
+        self.stdout.write(self.style.SUCCESS(
+            f"Listo. Usuarios '{prefijo}cliente000000'... con contraseña 'heladeria'."
+        ))
+
+    @contextmanager
+    def paso(self, nombre):
+        """Imprime el nombre del paso y cuánto tardó"""
+        self.stdout.write(f'{nombre}...')
+        inicio = time.perf_counter()
+        yield
+        self.stdout.write(f'  {time.perf_counter() - inicio:.1f} s')
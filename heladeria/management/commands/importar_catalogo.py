@@ -0,0 +1,242 @@
+import csv
+import json
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from heladeria.cache import invalidar_catalogo
+from heladeria.models import FragmentoInventario, Ingrediente, InventarioMovimiento, Producto, ProductoIngrediente
+
+
+CAMPOS_INGREDIENTE = ['nombre', 'tipo', 'precio', 'calorias', 'inventario', 'es_vegetariano', 'es_sano', 'sabor']
+# Sin inventario en el archivo: se conserva el stock actual (los nuevos empiezan en 0)
+CAMPOS_SIN_INVENTARIO = [campo for campo in CAMPOS_INGREDIENTE if campo != 'inventario']
+CAMPOS_PRODUCTO = ['nombre', 'tipo', 'precio_publico', 'tipo_vaso', 'volumen_onzas']
+CAMPOS_BOOLEANOS = ['es_vegetariano', 'es_sano']
+VERDADEROS = {'1', 'true', 'si', 'sí', 'x', 'yes'}
+
+
+def leer_filas(ruta):
+    """Lee una lista de diccionarios desde un archivo CSV o JSON"""
+    ruta = Path(ruta)
+    if ruta.suffix.lower() == '.json':
+        with open(ruta, encoding='utf-8') as archivo:
+            return json.load(archivo)
+    with open(ruta, encoding='utf-8', newline='') as archivo:
+        return list(csv.DictReader(archivo))
+
+
+def normalizar(fila, campos):
+    """Deja solo los campos conocidos; las cadenas vacías pasan a None"""
+    datos = {}
+    for campo in campos:
+        valor = fila.get(campo)
+        if isinstance(valor, str):
+            valor = valor.strip()
+            if campo in CAMPOS_BOOLEANOS:
+                valor = valor.lower() in VERDADEROS
+            elif valor == '':
+                valor = None
+        if campo in CAMPOS_BOOLEANOS and valor is None:
+            valor = False
+        datos[campo] = valor
+    return datos
+
+
+def lista_ingredientes(valor):
+    """Los ingredientes de un producto vienen como lista (JSON) o separados por '|' (CSV)"""
+    if isinstance(valor, list):
+        return [str(nombre).strip() for nombre in valor]
+    return [nombre.strip() for nombre in (valor or '').split('|') if nombre.strip()]
+
+
+def en_lotes(elementos, tamano):
+    for i in range(0, len(elementos), tamano):
+        yield elementos[i:i + tamano]
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa (crea o actualiza) ingredientes y productos desde archivos CSV o JSON. '
+        'El inventario de los ingredientes es opcional: sin él se conserva el stock actual.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ingredientes', help='Archivo CSV/JSON de ingredientes')
+        parser.add_argument(
+            '--productos',
+            help="Archivo CSV/JSON de productos (ingredientes por nombre, separados por '|' en CSV)"
+        )
+        parser.add_argument('--lote', type=int, default=1000, help='Filas por transacción')
+
+    def handle(self, *args, **options):
+        if not options['ingredientes'] and not options['productos']:
+            raise CommandError('Indica --ingredientes y/o --productos.')
+
+        filas_ingredientes = leer_filas(options['ingredientes']) if options['ingredientes'] else []
+        filas_productos = leer_filas(options['productos']) if options['productos'] else []
+
+        # 1. Validar todo antes de escribir nada
+        errores = []
+        ingredientes, sin_inventario = self.validar_ingredientes(filas_ingredientes, errores)
+        productos, recetas = self.validar_productos(filas_productos, ingredientes, errores)
+        if errores:
+            for error in errores:
+                self.stderr.write(error)
+            raise CommandError(f'{len(errores)} errores de validación; no se importó nada.')
+
+        # 2. Escribir por lotes con upsert (INSERT ... ON CONFLICT DO UPDATE)
+        lote = options['lote']
+        for grupo in en_lotes(ingredientes, lote):
+            with transaction.atomic():
+                # Inventario anterior (bloqueado) para anotar la diferencia en el libro,
+                # y precio y calorías para saber qué productos recalcular
+                nombres = [ingrediente.nombre for ingrediente in grupo]
+                filas = list(
+                    Ingrediente.objects.select_for_update().filter(nombre__in=nombres).con_existencias()
+                    .values_list('nombre', 'existencias', 'precio', 'calorias')
+                )
+                anteriores = {nombre: existencias for nombre, existencias, _, _ in filas}
+                metricas = {nombre: (precio, calorias) for nombre, _, precio, calorias in filas}
+                # Las filas sin inventario no lo tocan en los ingredientes existentes
+                con_inventario = [ingrediente for ingrediente in grupo if ingrediente.nombre not in sin_inventario]
+                sin_stock = [ingrediente for ingrediente in grupo if ingrediente.nombre in sin_inventario]
+                for subgrupo, campos in ((con_inventario, CAMPOS_INGREDIENTE), (sin_stock, CAMPOS_SIN_INVENTARIO)):
+                    if subgrupo:
+                        Ingrediente.objects.bulk_create(
+                            subgrupo,
+                            update_conflicts=True,
+                            unique_fields=['nombre'],
+                            update_fields=[campo for campo in campos if campo != 'nombre'],
+                        )
+                ids = self.ids_por_nombre(Ingrediente, nombres, lote)
+                # El inventario importado es el total: se vacían los fragmentos (se repartirá de nuevo)
+                FragmentoInventario.objects.filter(
+                    ingrediente_id__in=[ids[ingrediente.nombre] for ingrediente in con_inventario]
+                ).update(cantidad=0)
+                InventarioMovimiento.objects.registrar_ajustes(
+                    (ids[ingrediente.nombre], anteriores.get(ingrediente.nombre, 0), ingrediente.inventario)
+                    for ingrediente in con_inventario
+                )
+                # Ingredientes que se agotaron o se repusieron: cambia la disponibilidad de sus productos
+                cruzaron = [
+                    ids[ingrediente.nombre] for ingrediente in con_inventario
+                    if (anteriores.get(ingrediente.nombre, 0) > 0) != (ingrediente.inventario > 0)
+                ]
+                if cruzaron:
+                    Producto.objects.con_ingredientes(cruzaron).recalcular_disponible()
+                # Ingredientes existentes con otro precio o calorías: costo y calorías de sus productos
+                cambiaron = [
+                    ids[ingrediente.nombre] for ingrediente in grupo
+                    if ingrediente.nombre in metricas
+                    and metricas[ingrediente.nombre] != (ingrediente.precio, ingrediente.calorias)
+                ]
+                if cambiaron:
+                    Producto.objects.con_ingredientes(cambiaron).recalcular_metricas()
+
+        if productos:
+            ids_ingredientes = self.ids_por_nombre(
+                Ingrediente, {nombre for receta in recetas.values() for nombre in receta}, lote
+            )
+            for grupo in en_lotes(productos, lote):
+                with transaction.atomic():
+                    Producto.objects.bulk_create(
+                        grupo,
+                        update_conflicts=True,
+                        unique_fields=['nombre'],
+                        update_fields=[campo for campo in CAMPOS_PRODUCTO if campo != 'nombre'],
+                    )
+                    # Reemplazar las recetas de los productos del lote
+                    # _raw_delete: un solo DELETE sin señales (con delete() cada relación borrada
+                    # recalcularía su producto); el recálculo y la invalidación van una vez abajo
+                    ids_productos = self.ids_por_nombre(Producto, [p.nombre for p in grupo], lote)
+                    ProductoIngrediente.objects.filter(
+                        producto_id__in=ids_productos.values()
+                    )._raw_delete(ProductoIngrediente.objects.db)
+                    ProductoIngrediente.objects.bulk_create([
+                        ProductoIngrediente(
+                            producto_id=ids_productos[producto.nombre],
+                            ingrediente_id=ids_ingredientes[nombre],
+                        )
+                        for producto in grupo
+                        for nombre in recetas[producto.nombre]
+                    ])
+                    Producto.objects.filter(pk__in=ids_productos.values()).recalcular_receta()
+
+        # bulk_create y _raw_delete no disparan señales: invalidar el catálogo en caché a mano
+        invalidar_catalogo()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Importados {len(ingredientes)} ingredientes y {len(productos)} productos.'
+        ))
+
+    def validar_ingredientes(self, filas, errores):
+        """Ingredientes válidos y nombres de los que no traen inventario"""
+        ingredientes = []
+        sin_inventario = set()
+        vistos = set()
+        for numero, fila in enumerate(filas, start=1):
+            datos = normalizar(fila, CAMPOS_INGREDIENTE)
+            if datos['inventario'] is None:
+                datos['inventario'] = 0
+                sin_inventario.add(datos['nombre'])
+            ingrediente = Ingrediente(**datos)
+            try:
+                # Solo validaciones de campo (sin consultas de unicidad: el upsert las resuelve)
+                ingrediente.clean_fields()
+            except ValidationError as error:
+                errores.append(f'Ingrediente fila {numero}: {error.message_dict}')
+                continue
+            if ingrediente.nombre in vistos:
+                errores.append(f'Ingrediente fila {numero}: "{ingrediente.nombre}" está repetido.')
+            vistos.add(ingrediente.nombre)
+            ingredientes.append(ingrediente)
+        return ingredientes, sin_inventario
+
+    def validar_productos(self, filas, ingredientes, errores):
+        productos = []
+        recetas = {}
+        if not filas:
+            return productos, recetas
+
+        # Ingredientes válidos: los del archivo más los que ya existen (una consulta)
+        nombres_receta = {nombre for fila in filas for nombre in lista_ingredientes(fila.get('ingredientes'))}
+        conocidos = {ingrediente.nombre for ingrediente in ingredientes}
+        conocidos |= set(
+            Ingrediente.objects.filter(nombre__in=nombres_receta - conocidos).values_list('nombre', flat=True)
+        )
+
+        for numero, fila in enumerate(filas, start=1):
+            producto = Producto(**normalizar(fila, CAMPOS_PRODUCTO))
+            receta = lista_ingredientes(fila.get('ingredientes'))
+            try:
+                producto.clean_fields()
+            except ValidationError as error:
+                errores.append(f'Producto fila {numero}: {error.message_dict}')
+                continue
+            if producto.nombre in recetas:
+                errores.append(f'Producto fila {numero}: "{producto.nombre}" está repetido.')
+                continue
+            # Misma regla que ProductoForm.clean_ingredientes
+            if len(set(receta)) != Producto.NUM_INGREDIENTES:
+                errores.append(
+                    f'Producto fila {numero}: debe tener exactamente '
+                    f'{Producto.NUM_INGREDIENTES} ingredientes distintos.'
+                )
+                continue
+            faltantes = set(receta) - conocidos
+            if faltantes:
+                errores.append(f'Producto fila {numero}: ingredientes desconocidos {sorted(faltantes)}.')
+                continue
+            recetas[producto.nombre] = list(dict.fromkeys(receta))
+            productos.append(producto)
+        return productos, recetas
+
+    def ids_por_nombre(self, modelo, nombres, lote):
+        """Mapa nombre -> id, consultando por lotes para no armar IN gigantes"""
+        ids = {}
+        for grupo in en_lotes(list(nombres), lote):
+            ids.update(modelo.objects.filter(nombre__in=grupo).values_list('nombre', 'id'))
+        return ids
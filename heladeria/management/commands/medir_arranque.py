@@ -0,0 +1,117 @@
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el arranque en frío de gunicorn con gunicorn.conf.py: tiempo hasta que el puerto '
+        'acepta conexiones y hasta la primera respuesta, con y sin calentamiento.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ruta', default='/', help='Ruta de la primera petición')
+        parser.add_argument('--repeticiones', type=int, default=3)
+        parser.add_argument('--workers', type=int, default=1)
+        parser.add_argument('--espera', type=float, default=60, help='Segundos máximos por arranque')
+
+    def handle(self, *args, **options):
+        resultados = {}
+        for calentar in (False, True):
+            modo = 'con calentamiento' if calentar else 'sin calentamiento'
+            medidas = [self.arrancar(calentar, options) for _ in range(options['repeticiones'])]
+            resultados[modo] = medidas
+            self.stdout.write(f'{modo}: estado HTTP {medidas[-1]["estado"]}')
+
+        self.stdout.write(
+            f'{"modo":<20} {"puerto listo":>13} {"1.ª respuesta":>14} {"1.ª petición":>13} {"2.ª petición":>13}'
+        )
+        for modo, medidas in resultados.items():
+            mediana = {
+                clave: statistics.median(medida[clave] for medida in medidas)
+                for clave in ('listo', 'primera_respuesta', 'primera', 'segunda')
+            }
+            self.stdout.write(
+                f'{modo:<20} {mediana["listo"]:>10.0f} ms {mediana["primera_respuesta"]:>11.0f} ms '
+                f'{mediana["primera"]:>10.1f} ms {mediana["segunda"]:>10.1f} ms'
+            )
+        self.stdout.write(
+            f'(medianas de {options["repeticiones"]} arranques; tiempos desde que se lanza el proceso, '
+            'salvo las peticiones)'
+        )
+
+    def arrancar(self, calentar, options):
+        """Lanza gunicorn, espera la primera respuesta, hace una segunda petición y lo detiene"""
+        puerto = self.puerto_libre()
+        entorno = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE,
+            'PORT': str(puerto),
+            'WEB_CONCURRENCY': str(options['workers']),
+            'CALENTAR_AL_ARRANCAR': str(calentar),
+        }
+        comando = [
+            sys.executable, '-m', 'gunicorn', 'config.wsgi:application',
+            '-c', str(settings.BASE_DIR / 'gunicorn.conf.py'), '--bind', f'127.0.0.1:{puerto}',
+        ]
+        inicio = time.perf_counter()
+        proceso = subprocess.Popen(
+            comando, cwd=settings.BASE_DIR, env=entorno,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            limite = inicio + options['espera']
+            while True:
+                if proceso.poll() is not None:
+                    raise CommandError(f'gunicorn terminó con código {proceso.returncode}.')
+                if time.perf_counter() > limite:
+                    raise CommandError(f'gunicorn no abrió el puerto en {options["espera"]} s.')
+                try:
+                    socket.create_connection(('127.0.0.1', puerto), timeout=0.1).close()
+                    break
+                except OSError:
+                    time.sleep(0.005)
+            listo = time.perf_counter()
+
+            # Los workers pueden no existir aún: la petición espera en la cola del socket
+            estado, primera = self.pedir(puerto, options['ruta'], options['espera'])
+            primera_respuesta = time.perf_counter()
+            _, segunda = self.pedir(puerto, options['ruta'], options['espera'])
+        finally:
+            proceso.terminate()
+            proceso.wait()
+
+        return {
+            'estado': estado,
+            'listo': (listo - inicio) * 1000,
+            'primera_respuesta': (primera_respuesta - inicio) * 1000,
+            'primera': primera,
+            'segunda': segunda,
+        }
+
+    @staticmethod
+    def pedir(puerto, ruta, espera):
+        """GET a la ruta: (estado, milisegundos)"""
+        inicio = time.perf_counter()
+        conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=espera)
+        try:
+            # Como el proxy de Render: la petición llegó por HTTPS (evita la redirección en producción)
+            conexion.request('GET', ruta, headers={'X-Forwarded-Proto': 'https'})
+            respuesta = conexion.getresponse()
+            respuesta.read()
+        finally:
+            conexion.close()
+        return respuesta.status, (time.perf_counter() - inicio) * 1000
+
+    @staticmethod
+    def puerto_libre():
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
@@ -0,0 +1,44 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from heladeria.cache import cache_compartida
+from heladeria.pronostico import calcular_consumo, pronostico
+
+
+class Command(BaseCommand):
+    help = (
+        'Calcula el consumo diario de cada ingrediente con las ventas recientes y lo deja en '
+        'caché para el reporte de ingredientes por agotarse. Pensado para correr con cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=28, help='Días de ventas para el promedio')
+        parser.add_argument('--umbral', type=int, default=14, help='Mostrar los que se agotan en estos días')
+
+    def handle(self, *args, **options):
+        if options['dias'] < 1:
+            raise CommandError('--dias debe ser al menos 1.')
+        if options['umbral'] < 0:
+            raise CommandError('--umbral no puede ser negativo.')
+        if not cache_compartida():
+            self.stderr.write(self.style.WARNING(
+                'La caché no es compartida: el resultado se pierde al terminar este comando y '
+                'cada worker web calcula el suyo (usa REDIS_URL o CACHE_DB=True).'
+            ))
+
+        inicio = perf_counter()
+        datos = calcular_consumo(options['dias'])
+        segundos = perf_counter() - inicio
+        self.stdout.write(
+            f'Consumo de {len(datos["consumo"])} ingredientes en los últimos {datos["dias"]} días '
+            f'calculado en {segundos:.2f} s.'
+        )
+
+        _, filas = pronostico(options['umbral'])
+        for fila in filas:
+            self.stdout.write(
+                f'  {fila["nombre"]}: {fila["existencias"]} en stock, {fila["consumo_diario"]}/día, '
+                f'{fila["dias_restantes"]} días'
+            )
+        self.stdout.write(self.style.SUCCESS(f'{len(filas)} ingredientes se agotan en {options["umbral"]} días o menos.'))
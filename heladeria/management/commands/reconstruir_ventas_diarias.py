@@ -0,0 +1,54 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+from heladeria.models import Venta, VentaDiaria
+from heladeria.periodos import inicio_del_dia
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el resumen diario de ventas (VentaDiaria) a partir del historial'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--desde', type=str, default=None,
+            help='Reconstruir solo desde esta fecha (AAAA-MM-DD)'
+        )
+
+    def handle(self, *args, **options):
+        ventas = Venta.objects.all()
+        resumen = VentaDiaria.objects.all()
+        if options['desde']:
+            desde = date.fromisoformat(options['desde'])
+            # Rango desde la medianoche local: usa el índice de Venta.fecha
+            ventas = ventas.filter(fecha__gte=inicio_del_dia(desde))
+            resumen = resumen.filter(fecha__gte=desde)
+
+        # Agrupar por día local y producto directamente en la base de datos
+        filas = (
+            ventas.annotate(dia=TruncDate('fecha'))
+            .values('dia', 'producto_id')
+            .annotate(cantidad=Sum('cantidad'), total=Sum('total'), ventas=Count('id'))
+            .order_by()
+        )
+
+        with transaction.atomic():
+            resumen.delete()
+            creadas = VentaDiaria.objects.bulk_create(
+                (
+                    VentaDiaria(
+                        fecha=fila['dia'],
+                        producto_id=fila['producto_id'],
+                        cantidad=fila['cantidad'],
+                        total=fila['total'],
+                        ventas=fila['ventas'],
+                    )
+                    for fila in filas.iterator()
+                ),
+                batch_size=1000,
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'{len(creadas)} filas de resumen diario reconstruidas.'))
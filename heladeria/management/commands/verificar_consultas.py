@@ -0,0 +1,61 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from heladeria.consultas import LIMITE_DEFECTO, TAMANOS, RutaConError, contar, reportar
+
+
+class Command(BaseCommand):
+    help = (
+        'Recorre todas las rutas con nombre de heladeria/urls.py como anónimo, CLIENTE, '
+        'EMPLEADO y ADMINISTRADOR, las listas del admin de heladeria como superusuario y un '
+        'POST válido a venta_crear y pedido_crear, con datos pequeños y grandes. Falla si una '
+        'ruta supera su presupuesto de consultas (settings.PRESUPUESTOS_RUTAS) o si sus consultas '
+        'crecen con la cantidad de filas. Usa una base de datos de prueba. '
+        'Lo mismo que heladeria/tests/test_consultas.py, con la tabla completa.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limite-defecto', type=int, default=LIMITE_DEFECTO,
+            help='Máximo de consultas para rutas sin presupuesto en PRESUPUESTOS_RUTAS'
+        )
+        parser.add_argument('--semilla', type=int, default=42)
+
+    def handle(self, *args, **options):
+        logging.getLogger('heladeria.medicion').setLevel(logging.ERROR)
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+
+        setup_test_environment()
+        nombre_original = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            conteos = {
+                tamano: contar(tamano, options['semilla'])
+                for tamano in TAMANOS
+            }
+        except RutaConError as error:
+            raise CommandError(str(error))
+        finally:
+            connection.creation.destroy_test_db(nombre_original, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(
+            f"{'ruta':<28} {'rol':<14} {'frío':>9} {'caliente':>9} {'límite':>7}   (pequeño/grande)"
+        )
+        fallas = []
+        for ruta, rol, (frio_p, caliente_p), (frio_g, caliente_g), limite, problemas in reportar(
+            conteos, options['limite_defecto']
+        ):
+            if problemas:
+                fallas.append(f'{ruta}/{rol}')
+            estado = self.style.ERROR(', '.join(problemas)) if problemas else 'ok'
+            self.stdout.write(
+                f'{ruta:<28} {rol:<14} {frio_p:>4}/{frio_g:<4} {caliente_p:>4}/{caliente_g:<4} {limite:>7}   {estado}'
+            )
+
+        if fallas:
+            raise CommandError(f'{len(fallas)} combinaciones ruta/rol fallaron: {", ".join(fallas)}')
+        self.stdout.write(self.style.SUCCESS('Todas las rutas dentro del presupuesto y sin N+1.'))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from heladeria.models import Usuario, Venta
+
+
+def consultas_con_indice(usuario):
+    """(índice esperado, queryset) de cada filtro de ventas por periodo"""
+    return [
+        ('venta_fecha_idx', Venta.objects.del_periodo('hoy')),
+        ('venta_fecha_idx', Venta.objects.del_periodo('mes')),
+        ('venta_usuario_fecha_idx', Venta.objects.filter(usuario=usuario).del_periodo('semana')),
+    ]
+
+
+def planes(usuario):
+    """Lista de (índice esperado, plan de EXPLAIN) de consultas_con_indice"""
+    with transaction.atomic():
+        # En PostgreSQL con pocas filas el planificador prefiere leer la tabla completa;
+        # se desactiva para comprobar que el índice es utilizable
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return [(indice, queryset.explain()) for indice, queryset in consultas_con_indice(usuario)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Verifica con EXPLAIN que los filtros de ventas por periodo usan los índices de fecha '
+        '(en la base configurada; heladeria/tests/test_indices.py hace lo mismo con sus datos)'
+    )
+
+    def handle(self, *args, **options):
+        usuario = Usuario.objects.order_by('pk').first()
+        if usuario is None:
+            # Sin usuarios no se puede armar el filtro por usuario: es una falla, no se omite
+            raise CommandError('No hay usuarios: no se puede verificar venta_usuario_fecha_idx.')
+
+        fallas = 0
+        for indice, plan in planes(usuario):
+            if indice in plan:
+                self.stdout.write(self.style.SUCCESS(f'OK  {indice}'))
+            else:
+                fallas += 1
+                self.stdout.write(self.style.ERROR(f'SIN ÍNDICE  {indice}'))
+                self.stdout.write(plan)
+
+        if fallas:
+            raise CommandError(f'{fallas} consultas no usan el índice esperado.')
@@ -0,0 +1,174 @@
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+
+logger = logging.getLogger('heladeria.medicion')
+
+# Medición de la petición en curso (None fuera de una petición)
+# Un ContextVar funciona igual con hilos (WSGI) y con tareas asíncronas (ASGI)
+_medicion = ContextVar('heladeria_medicion', default=None)
+
+# Métricas que se pueden limitar en PRESUPUESTOS_RUTAS
+METRICAS = ('consultas', 'db_ms', 'plantillas_ms', 'total_ms')
+
+
+class Medicion:
+    __slots__ = ('consultas', 'db', 'plantillas', 'inicio')
+
+    def __init__(self):
+        self.consultas = 0
+        self.db = 0.0
+        self.plantillas = 0.0
+        self.inicio = time.perf_counter()
+
+    def resumen(self):
+        return {
+            'consultas': self.consultas,
+            'db_ms': round(self.db * 1000, 1),
+            'plantillas_ms': round(self.plantillas * 1000, 1),
+            'total_ms': round((time.perf_counter() - self.inicio) * 1000, 1),
+        }
+
+
+# ============================================
+# CONSULTAS SQL
+# ============================================
+
+def _medir_consulta(execute, sql, params, many, context):
+    medicion = _medicion.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicion.db += time.perf_counter() - inicio
+        medicion.consultas += 1
+
+
+def _instalar(connection, **kwargs):
+    """Agrega el contador a la conexión (una sola vez por conexión)"""
+    if _medir_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_medir_consulta)
+
+
+# Las conexiones nuevas (una por hilo) quedan instrumentadas al abrirse
+connection_created.connect(_instalar)
+
+
+# ============================================
+# PLANTILLAS
+# ============================================
+
+# Backend de plantillas que mide Template.render (settings.TEMPLATES['BACKEND']): lo llaman
+# render(), render_to_string() y TemplateResponse, no los {% include %}, así que las
+# plantillas anidadas no se cuentan dos veces
+
+class PlantillaMedida(Template):
+    def render(self, context=None, request=None):
+        medicion = _medicion.get()
+        if medicion is None:
+            return super().render(context, request)
+        inicio = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            medicion.plantillas += time.perf_counter() - inicio
+
+
+class DjangoTemplatesMedidas(DjangoTemplates):
+    def from_string(self, template_code):
+        return PlantillaMedida(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return PlantillaMedida(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+# ============================================
+# MIDDLEWARE
+# ============================================
+
+class MedicionMiddleware:
+    """
+    Mide cada petición: número de consultas SQL, tiempo en la base de datos,
+    tiempo renderizando plantillas y tiempo total.
+    - Cabecera Server-Timing (visible en las herramientas del navegador)
+    - Una línea de log por petición con el nombre de la ruta (logger heladeria.medicion)
+    - Advertencia si la ruta supera su presupuesto (settings.PRESUPUESTOS_RUTAS)
+
+    Las respuestas en streaming (venta_exportar) consultan mientras el servidor envía el
+    cuerpo, después de este middleware: esas consultas y ese tiempo no se cuentan.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # Conexiones abiertas antes de cargar el middleware
+        for connection in connections.all(initialized_only=True):
+            _instalar(connection)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        medicion = Medicion()
+        token = _medicion.set(medicion)
+        try:
+            response = self.get_response(request)
+        finally:
+            _medicion.reset(token)
+        self.registrar(request, response, medicion)
+        return response
+
+    async def __acall__(self, request):
+        medicion = Medicion()
+        token = _medicion.set(medicion)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _medicion.reset(token)
+        self.registrar(request, response, medicion)
+        return response
+
+    def registrar(self, request, response, medicion):
+        datos = medicion.resumen()
+        match = request.resolver_match
+        ruta = match.url_name if match and match.url_name else '-'
+
+        if settings.MEDICION_SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'db;dur={datos["db_ms"]};desc="{datos["consultas"]} SQL", '
+                f'tpl;dur={datos["plantillas_ms"]}, '
+                f'total;dur={datos["total_ms"]}'
+            )
+
+        # Formato clave=valor: fácil de filtrar con grep y de parsear en el agregador de logs
+        linea = ' '.join(f'{clave}={valor}' for clave, valor in datos.items())
+        extra = {'ruta': ruta, 'medicion': datos}
+        logger.info('ruta=%s metodo=%s estado=%s %s', ruta, request.method,
+                    response.status_code, linea, extra=extra)
+
+        presupuesto = settings.PRESUPUESTOS_RUTAS.get(ruta)
+        if presupuesto:
+            excedidas = [
+                f'{metrica}={datos[metrica]}>{limite}'
+                for metrica, limite in presupuesto.items()
+                if metrica in datos and datos[metrica] > limite
+            ]
+            if excedidas:
+                logger.warning('presupuesto excedido ruta=%s %s', ruta,
+                               ' '.join(excedidas), extra=extra)
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('heladeria', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='ingrediente',
+            constraint=models.CheckConstraint(check=models.Q(('inventario__gte', 0)), name='ingrediente_inventario_no_negativo'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:01
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+
+def poblar_ventas_diarias(apps, schema_editor):
+    # Cargar el resumen con el historial de ventas existente
+    Venta = apps.get_model('heladeria', 'Venta')
+    VentaDiaria = apps.get_model('heladeria', 'VentaDiaria')
+    filas = (
+        Venta.objects.annotate(dia=TruncDate('fecha'))
+        .values('dia', 'producto_id')
+        .annotate(cantidad=Sum('cantidad'), total=Sum('total'), ventas=Count('id'))
+        .order_by()
+    )
+    VentaDiaria.objects.bulk_create(
+        [
+            VentaDiaria(
+                fecha=fila['dia'],
+                producto_id=fila['producto_id'],
+                cantidad=fila['cantidad'],
+                total=fila['total'],
+                ventas=fila['ventas'],
+            )
+            for fila in filas
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('heladeria', '0003_pedido'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VentaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('cantidad', models.PositiveIntegerField(default=0, verbose_name='Unidades vendidas')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Total')),
+                ('ventas', models.PositiveIntegerField(default=0, verbose_name='Número de ventas')),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ventas_diarias', to='heladeria.producto', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Venta diaria',
+                'verbose_name_plural': 'Ventas diarias',
+                'ordering': ['-fecha'],
+                'unique_together': {('fecha', 'producto')},
+            },
+        ),
+        migrations.RunPython(poblar_ventas_diarias, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def crear_checkpoints_iniciales(apps, schema_editor):
+    # El inventario actual es el punto de partida del libro de movimientos
+    Ingrediente = apps.get_model('heladeria', 'Ingrediente')
+    InventarioCheckpoint = apps.get_model('heladeria', 'InventarioCheckpoint')
+    ahora = django.utils.timezone.now()
+    InventarioCheckpoint.objects.bulk_create(
+        [
+            InventarioCheckpoint(ingrediente_id=pk, fecha=ahora, saldo=inventario)
+            for pk, inventario in Ingrediente.objects.values_list('pk', 'inventario')
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('heladeria', '0005_venta_indices_fecha'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventarioMovimiento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('VENTA', 'Venta'), ('REPOSICION', 'Reposición'), ('AJUSTE', 'Ajuste')], max_length=15, verbose_name='Tipo')),
+                ('cantidad', models.IntegerField(verbose_name='Cantidad')),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha')),
+                ('ingrediente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movimientos', to='heladeria.ingrediente', verbose_name='Ingrediente')),
+                ('venta', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movimientos', to='heladeria.venta', verbose_name='Venta')),
+            ],
+            options={
+                'verbose_name': 'Movimiento de inventario',
+                'verbose_name_plural': 'Movimientos de inventario',
+                'ordering': ['-fecha'],
+                'indexes': [models.Index(fields=['ingrediente', 'fecha'], name='movimiento_ingrediente_idx'), models.Index(fields=['fecha'], name='movimiento_fecha_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='InventarioCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateTimeField(verbose_name='Fecha')),
+                ('saldo', models.IntegerField(verbose_name='Saldo')),
+                ('ingrediente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='heladeria.ingrediente', verbose_name='Ingrediente')),
+            ],
+            options={
+                'verbose_name': 'Punto de control de inventario',
+                'verbose_name_plural': 'Puntos de control de inventario',
+                'ordering': ['-fecha'],
+                'unique_together': {('ingrediente', 'fecha')},
+            },
+        ),
+        migrations.RunPython(crear_checkpoints_iniciales, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('heladeria', '0006_inventario_movimientos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingrediente',
+            name='fragmentos',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Fragmentos de inventario'),
+        ),
+        migrations.CreateModel(
+            name='FragmentoInventario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('numero', models.PositiveSmallIntegerField(verbose_name='Número')),
+                ('cantidad', models.PositiveIntegerField(default=0, verbose_name='Cantidad')),
+                ('ingrediente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fragmentos_inventario', to='heladeria.ingrediente', verbose_name='Ingrediente')),
+            ],
+            options={
+                'verbose_name': 'Fragmento de inventario',
+                'verbose_name_plural': 'Fragmentos de inventario',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='fragmentoinventario',
+            constraint=models.CheckConstraint(check=models.Q(('cantidad__gte', 0)), name='fragmento_inventario_no_negativo'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='fragmentoinventario',
+            unique_together={('ingrediente', 'numero')},
+        ),
+    ]
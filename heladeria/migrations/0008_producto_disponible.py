@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:25
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def calcular_disponible(apps, schema_editor):
+    # Productos con algún ingrediente agotado (los fragmentados cuentan lo repartido)
+    Producto = apps.get_model('heladeria', 'Producto')
+    ProductoIngrediente = apps.get_model('heladeria', 'ProductoIngrediente')
+    FragmentoInventario = apps.get_model('heladeria', 'FragmentoInventario')
+    con_fragmentos = FragmentoInventario.objects.filter(
+        ingrediente=OuterRef('ingrediente'), cantidad__gt=0
+    )
+    sin_stock = ProductoIngrediente.objects.filter(
+        producto=OuterRef('pk'), ingrediente__inventario__lte=0
+    ).exclude(Exists(con_fragmentos))
+    Producto.objects.update(disponible=~Exists(sin_stock))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('heladeria', '0007_inventario_fragmentado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='disponible',
+            field=models.BooleanField(default=True, editable=False, verbose_name='Disponible'),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['disponible', 'nombre'], name='producto_disponible_idx'),
+        ),
+        migrations.RunPython(calcular_disponible, migrations.RunPython.noop),
+    ]
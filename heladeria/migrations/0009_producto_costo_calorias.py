@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:28
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+import django.db.models.expressions
+
+
+def calcular_costo_calorias(apps, schema_editor):
+    # Suma de precios y calorías de los ingredientes de cada producto
+    Producto = apps.get_model('heladeria', 'Producto')
+    ProductoIngrediente = apps.get_model('heladeria', 'ProductoIngrediente')
+    receta = ProductoIngrediente.objects.filter(producto=OuterRef('pk')).order_by().values('producto')
+    Producto.objects.update(
+        costo=Coalesce(
+            Subquery(receta.annotate(total=Sum('ingrediente__precio')).values('total')),
+            Value(Decimal('0.00')),
+            output_field=models.DecimalField(max_digits=10, decimal_places=2)
+        ),
+        calorias_totales=Coalesce(
+            Subquery(receta.annotate(total=Sum('ingrediente__calorias')).values('total')), Value(0)
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('heladeria', '0008_producto_disponible'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='calorias_totales',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Calorías totales'),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='costo',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=10, verbose_name='Costo de producción'),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(django.db.models.expressions.CombinedExpression(models.F('precio_publico'), '-', models.F('costo')), name='producto_rentabilidad_idx'),
+        ),
+        migrations.RunPython(calcular_costo_calorias, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,24 @@
-from django.db import models
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+import random
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import (
+    Case, DateTimeField, DecimalField, Exists, ExpressionWrapper, F, FloatField, IntegerField, OuterRef, Q, Subquery,
+    Sum, Value, When, Window
+)
+from django.db.models.functions import Cast, Coalesce, NullIf, Rank
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator
+from django.utils import timezone
+
+from .cache import invalidar_catalogo, invalidar_stock, invalidar_total_gastado
+from .periodos import rango_periodo
+
+
+# Error que se lanza cuando no alcanza el inventario para una venta
+class InventarioInsuficiente(Exception):
+    pass
 
 
 # Paso 1: Modelo de Usuario personalizado
@@ -36,6 +54,74 @@ class Usuario(AbstractUser):
 # Los ingredientes pueden ser BASES (como helado de vainilla) 
 # o COMPLEMENTOS (como chispas de chocolate)
 
+# Fecha anterior a cualquier movimiento (ingredientes sin punto de control)
+INICIO_LIBRO = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class IngredienteQuerySet(models.QuerySet):
+    def con_stock_al(self, momento=None):
+        """
+        Anota stock_al: stock según el libro de movimientos justo antes de `momento`
+        (sin momento: el stock actual). Último punto de control + movimientos desde entonces.
+        """
+        checkpoints = InventarioCheckpoint.objects.filter(ingrediente=OuterRef('pk'))
+        if momento is not None:
+            checkpoints = checkpoints.filter(fecha__lte=momento)
+        checkpoints = checkpoints.order_by('-fecha')
+        
+        movimientos = InventarioMovimiento.objects.filter(
+            ingrediente=OuterRef('pk'), fecha__gte=OuterRef('checkpoint_fecha')
+        )
+        if momento is not None:
+            movimientos = movimientos.filter(fecha__lt=momento)
+        suma = movimientos.order_by().values('ingrediente').annotate(total=Sum('cantidad')).values('total')
+        
+        return self.annotate(
+            checkpoint_fecha=Coalesce(
+                Subquery(checkpoints.values('fecha')[:1]), Value(INICIO_LIBRO), output_field=DateTimeField()
+            ),
+            checkpoint_saldo=Coalesce(Subquery(checkpoints.values('saldo')[:1]), Value(0)),
+        ).annotate(
+            stock_al=ExpressionWrapper(
+                F('checkpoint_saldo') + Coalesce(Subquery(suma), Value(0)),
+                output_field=IntegerField()
+            )
+        )
+    
+    def con_existencias(self):
+        """Anota existencias: inventario más lo repartido en fragmentos (si el ingrediente está fragmentado)"""
+        fragmentos = (
+            FragmentoInventario.objects.filter(ingrediente=OuterRef('pk'))
+            .order_by().values('ingrediente').annotate(total=Sum('cantidad')).values('total')
+        )
+        return self.annotate(
+            existencias=ExpressionWrapper(
+                F('inventario') + Coalesce(Subquery(fragmentos), Value(0)),
+                output_field=IntegerField()
+            )
+        )
+    
+    def renovar_inventario(self):
+        """Renueva (deja en 0) los complementos del queryset, con su movimiento en el libro"""
+        with transaction.atomic():
+            complementos = self.filter(tipo='COMPLEMENTO')
+            anteriores = list(
+                complementos.select_for_update().con_existencias()
+                .filter(existencias__gt=0).values_list('pk', 'existencias')
+            )
+            count = complementos.update(inventario=0)
+            FragmentoInventario.objects.filter(ingrediente__in=complementos).update(cantidad=0)
+            InventarioMovimiento.objects.registrar_ajustes(
+                (pk, existencias, 0) for pk, existencias in anteriores
+            )
+            # Los que tenían stock se agotaron
+            Producto.objects.con_ingredientes([pk for pk, _ in anteriores]).recalcular_disponible()
+            # update() no dispara señales: invalidar el catálogo (y el stock) al confirmar
+            if count:
+                transaction.on_commit(invalidar_catalogo)
+        return count
+
+
 class Ingrediente(models.Model):
     # Tipos de ingredientes
     TIPO_CHOICES = [
@@ -65,20 +151,81 @@ class Ingrediente(models.Model):
         verbose_name='Sabor (solo para bases)'
     )
     
+    # Contador fragmentado (opcional, para bases muy vendidas): el stock se reparte en
+    # N filas de FragmentoInventario y cada venta descuenta de una al azar, así las ventas
+    # simultáneas no esperan todas por la misma fila. 0 = un solo contador (inventario)
+    # Con fragmentos, inventario guarda solo lo que aún no se ha repartido
+    fragmentos = models.PositiveSmallIntegerField(default=0, verbose_name='Fragmentos de inventario')
+    
+    objects = IngredienteQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Ingrediente'
         verbose_name_plural = 'Ingredientes'
         ordering = ['nombre']
+        # La base de datos nunca permite inventario negativo
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(inventario__gte=0),
+                name='ingrediente_inventario_no_negativo'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.nombre} ({self.get_tipo_display()})"
     
+    # Al guardar se anota en el libro de movimientos cuánto cambió el inventario
+    # (formularios, admin, renovar_inventario). Se lee el valor actual con bloqueo
+    # para que una venta simultánea no descuadre la diferencia
+    # En un ingrediente fragmentado, un inventario distinto al guardado es el nuevo total:
+    # los fragmentos se vacían y se vuelven a repartir en la siguiente venta
+    # Si cambia el precio o las calorías se recalculan el costo y las calorías de sus productos
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        guarda_inventario = update_fields is None or 'inventario' in update_fields
+        guarda_metricas = update_fields is None or {'precio', 'calorias'} & set(update_fields)
+        if not guarda_inventario and not guarda_metricas:
+            return super().save(*args, **kwargs)
+        
+        with transaction.atomic():
+            es_nuevo = self._state.adding
+            anterior = 0
+            metricas_cambiaron = False
+            if not es_nuevo:
+                actual, precio, calorias = Ingrediente.objects.select_for_update().filter(
+                    pk=self.pk
+                ).values_list('inventario', 'precio', 'calorias').first() or (0, self.precio, self.calorias)
+                metricas_cambiaron = guarda_metricas and (precio, calorias) != (self.precio, self.calorias)
+                anterior = actual
+                if guarda_inventario and self.fragmentos and self.inventario != actual:
+                    repartidos = FragmentoInventario.objects.select_for_update().filter(ingrediente=self)
+                    anterior += sum(repartidos.values_list('cantidad', flat=True))
+                    repartidos.update(cantidad=0)
+            super().save(*args, **kwargs)
+            
+            if metricas_cambiaron:
+                Producto.objects.con_ingredientes([self.pk]).recalcular_metricas()
+            if not guarda_inventario:
+                return
+            existencias = self.existencias()
+            InventarioMovimiento.objects.registrar_ajustes([(self.pk, anterior, existencias)])
+            # Se agotó o se repuso: cambia la disponibilidad de sus productos
+            if not es_nuevo and (anterior > 0) != (existencias > 0):
+                Producto.objects.con_ingredientes([self.pk]).recalcular_disponible()
+    
+    def existencias(self):
+        """Stock total: inventario más lo repartido en fragmentos"""
+        if not self.fragmentos:
+            return self.inventario
+        repartido = self.fragmentos_inventario.aggregate(total=Sum('cantidad'))['total'] or 0
+        return self.inventario + repartido
+    
     # Método para renovar inventario
     # Si es complemento, se pone en 0
     def renovar_inventario(self):
         if self.tipo == 'COMPLEMENTO':
+            Ingrediente.objects.filter(pk=self.pk).renovar_inventario()
             self.inventario = 0
-            self.save()
             return True
         return False
 
@@ -87,6 +234,127 @@ class Ingrediente(models.Model):
 # Los productos son lo que vendemos: COPAS o MALTEADAS
 # Cada producto está compuesto por 3 ingredientes
 
+# QuerySet de productos con métricas calculadas en la base de datos
+# Evita una consulta de ingredientes por producto en listados y rankings
+
+def _hay_stock():
+    """Expresión: ningún ingrediente del producto (OuterRef('pk')) está agotado"""
+    con_fragmentos = FragmentoInventario.objects.filter(
+        ingrediente=OuterRef('ingrediente'), cantidad__gt=0
+    )
+    sin_stock = ProductoIngrediente.objects.filter(
+        producto=OuterRef('pk'),
+        ingrediente__inventario__lte=0
+    ).exclude(Exists(con_fragmentos))
+    return ~Exists(sin_stock)
+
+
+def _receta():
+    return ProductoIngrediente.objects.filter(producto=OuterRef('pk')).order_by().values('producto')
+
+
+def _costo_receta():
+    """Expresión: suma de precios de los ingredientes del producto (OuterRef('pk'))"""
+    return Coalesce(
+        Subquery(_receta().annotate(total=Sum('ingrediente__precio')).values('total')),
+        Value(Decimal('0.00')),
+        output_field=DecimalField(max_digits=10, decimal_places=2)
+    )
+
+
+def _calorias_receta():
+    """Expresión: suma de calorías de los ingredientes del producto (OuterRef('pk'))"""
+    return Coalesce(
+        Subquery(_receta().annotate(total=Sum('ingrediente__calorias')).values('total')),
+        Value(0)
+    )
+
+
+# Misma expresión que el índice producto_rentabilidad_idx (así la base de datos lo usa al ordenar)
+RENTABILIDAD = ExpressionWrapper(
+    F('precio_publico') - F('costo'),
+    output_field=DecimalField(max_digits=10, decimal_places=2)
+)
+
+
+class ProductoQuerySet(models.QuerySet):
+    def with_stock(self):
+        """Anota hay_stock calculado desde los ingredientes (disponible es su copia guardada)"""
+        return self.annotate(hay_stock=_hay_stock())
+    
+    def disponibles(self):
+        """Productos con todos sus ingredientes en stock (usa el índice de disponible)"""
+        return self.filter(disponible=True)
+    
+    def con_ingredientes(self, ingrediente_ids):
+        return self.filter(pk__in=ProductoIngrediente.objects.filter(
+            ingrediente_id__in=ingrediente_ids
+        ).values('producto_id'))
+    
+    def recalcular_disponible(self):
+        """
+        Recalcula disponible en un solo UPDATE, solo en las filas que cambian.
+        Devuelve cuántos productos cambiaron de disponibilidad.
+        """
+        return self.alias(calculado=_hay_stock()).exclude(
+            disponible=F('calculado')
+        ).update(disponible=_hay_stock())
+    
+    def recalcular_metricas(self):
+        """Recalcula costo y calorias_totales desde los ingredientes en un solo UPDATE"""
+        return self.update(costo=_costo_receta(), calorias_totales=_calorias_receta())
+    
+    def con_calculados(self):
+        """Anota costo_calculado, calorias_calculadas y disponible_calculado desde los ingredientes"""
+        return self.annotate(
+            costo_calculado=_costo_receta(),
+            calorias_calculadas=_calorias_receta(),
+            disponible_calculado=_hay_stock(),
+        )
+    
+    def recalcular_receta(self):
+        """Tras un cambio de receta: recalcula disponible, costo y calorias_totales"""
+        self.recalcular_disponible()
+        self.recalcular_metricas()
+    
+    def with_metrics(self):
+        """Anota rentabilidad desde las columnas guardadas (sin recorrer los ingredientes)"""
+        return self.annotate(rentabilidad=RENTABILIDAD)
+    
+    def ranking_rentabilidad(self, desde=None, hasta=None):
+        """
+        Anota, en una sola consulta agrupada sobre el resumen diario (VentaDiaria):
+        - rentabilidad y margen (% del precio público)
+        - unidades, ingresos y ganancia (ingresos - unidades * costo) entre desde y hasta
+          (fechas locales, ambas incluidas, opcionales)
+        - puesto_rentabilidad y puesto_ganancia con RANK() (funciones de ventana)
+        Los puestos se calculan sobre el queryset filtrado (por ejemplo, por tipo).
+        """
+        rango = Q()
+        if desde:
+            rango &= Q(ventas_diarias__fecha__gte=desde)
+        if hasta:
+            rango &= Q(ventas_diarias__fecha__lte=hasta)
+        dinero = DecimalField(max_digits=14, decimal_places=2)
+        
+        return self.annotate(
+            rentabilidad=RENTABILIDAD,
+            margen=ExpressionWrapper(
+                RENTABILIDAD * Value(100) / NullIf(F('precio_publico'), Value(0)),
+                output_field=DecimalField(max_digits=10, decimal_places=2)
+            ),
+            unidades=Coalesce(Sum('ventas_diarias__cantidad', filter=rango), Value(0)),
+            ingresos=Coalesce(Sum('ventas_diarias__total', filter=rango), Value(Decimal('0.00')), output_field=dinero),
+        ).annotate(
+            ganancia=ExpressionWrapper(F('ingresos') - F('unidades') * F('costo'), output_field=dinero),
+        ).annotate(
+            # Se ordena por el valor como float: con un decimal, Django 4.2 envuelve el
+            # ORDER BY de la ventana en un CAST inválido en SQLite
+            puesto_rentabilidad=Window(Rank(), order_by=[Cast('rentabilidad', FloatField()).desc()]),
+            puesto_ganancia=Window(Rank(), order_by=[Cast('ganancia', FloatField()).desc()]),
+        )
+
+
 class Producto(models.Model):
     # Tipos de productos
     TIPO_CHOICES = [
@@ -119,6 +387,9 @@ class Producto(models.Model):
         verbose_name='Volumen en onzas (solo para malteadas)'
     )
     
+    # Cantidad de ingredientes que debe tener cada producto
+    NUM_INGREDIENTES = 3
+    
     # Relación con ingredientes (many-to-many)
     # Un producto puede tener varios ingredientes
     # Un ingrediente puede estar en varios productos
@@ -129,14 +400,50 @@ class Producto(models.Model):
         verbose_name='Ingredientes'
     )
     
+    # Copia guardada de hay_inventario_disponible(): se recalcula (en la misma transacción)
+    # solo cuando el stock de uno de sus ingredientes pasa por cero o cambia la receta
+    disponible = models.BooleanField(default=True, editable=False, verbose_name='Disponible')
+    
+    # Copias guardadas de calcular_costo() y calcular_calorias(): se recalculan cuando cambia
+    # el precio o las calorías de un ingrediente, o la receta (conciliar_productos las verifica)
+    costo = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        editable=False,
+        verbose_name='Costo de producción'
+    )
+    calorias_totales = models.PositiveIntegerField(default=0, editable=False, verbose_name='Calorías totales')
+    
+    objects = ProductoQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Producto'
         verbose_name_plural = 'Productos'
         ordering = ['nombre']
+        # Catálogo de productos disponibles ordenado por nombre
+        indexes = [
+            models.Index(fields=['disponible', 'nombre'], name='producto_disponible_idx'),
+            # Ranking por rentabilidad (precio_publico - costo)
+            models.Index(F('precio_publico') - F('costo'), name='producto_rentabilidad_idx'),
+        ]
     
     def __str__(self):
         return f"{self.nombre} ({self.get_tipo_display()})"
     
+    # Columnas calculadas: solo las escriben los UPDATE de recalcular_disponible/recalcular_metricas
+    CALCULADOS = ('disponible', 'costo', 'calorias_totales')
+    
+    # Al actualizar (formularios, admin) no se reescriben las columnas calculadas: los
+    # valores en memoria pueden ser viejos y pisarían un recálculo hecho por otra transacción
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                campo.name for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.name not in self.CALCULADOS
+            ]
+        super().save(*args, **kwargs)
+    
     # Método para calcular cuánto nos cuesta hacer el producto
     def calcular_costo(self):
         return sum(ingrediente.precio for ingrediente in self.ingredientes.all())
@@ -151,11 +458,46 @@ class Producto(models.Model):
         return self.precio_publico - self.calcular_costo()
     
     # Método para verificar si hay inventario de todos los ingredientes
+    # (recorre los ingredientes; para una consulta rápida usar el campo disponible)
     def hay_inventario_disponible(self):
         for ingrediente in self.ingredientes.all():
-            if ingrediente.inventario <= 0:
+            if ingrediente.existencias() <= 0:
                 return False
         return True
+    
+    # Método para descontar inventario de todos los ingredientes
+    # Se hace con un solo UPDATE usando F(), así no hay carreras entre ventas
+    # Si algún ingrediente quedara negativo, la restricción de la base de datos
+    # rechaza el UPDATE completo y no se descuenta nada
+    # Cada descuento queda también en el libro de movimientos (ligado a la venta)
+    # Los ingredientes fragmentados descuentan de uno de sus fragmentos
+    # Si un ingrediente se agota, se recalcula disponible de los productos que lo usan
+    def descontar_inventario(self, cantidad, venta=None):
+        relaciones = list(
+            ProductoIngrediente.objects.filter(producto=self)
+            .values_list('ingrediente_id', 'ingrediente__fragmentos')
+        )
+        ingrediente_ids = [ingrediente_id for ingrediente_id, _ in relaciones]
+        fragmentados = sorted((ingrediente_id, n) for ingrediente_id, n in relaciones if n)
+        try:
+            with transaction.atomic():
+                Ingrediente.objects.filter(pk__in=ingrediente_ids, fragmentos=0).update(
+                    inventario=F('inventario') - cantidad
+                )
+                # En orden de id: dos ventas nunca se esperan en orden cruzado
+                for ingrediente_id, n in fragmentados:
+                    FragmentoInventario.objects.descontar(ingrediente_id, n, cantidad)
+                InventarioMovimiento.objects.bulk_create([
+                    InventarioMovimiento(
+                        ingrediente_id=ingrediente_id, tipo='VENTA', cantidad=-cantidad, venta=venta
+                    )
+                    for ingrediente_id in ingrediente_ids
+                ])
+                actualizar_disponibilidad(ingrediente_ids)
+        except IntegrityError:
+            raise InventarioInsuficiente(
+                f'No hay inventario suficiente para {cantidad} x {self.nombre}.'
+            )
 
 
 # Paso 4: Tabla intermedia Producto-Ingrediente
@@ -183,10 +525,170 @@ class ProductoIngrediente(models.Model):
         return f"{self.producto.nombre} - {self.ingrediente.nombre}"
 
 
-# Paso 5: Modelo de Venta
+# Disponibilidad guardada de los productos
+# Tras descontar, un ingrediente con stock 0 se acaba de agotar (si ya estaba en 0 la venta
+# habría fallado), así que solo se recalculan los productos que lo usan
+# La caché de disponibilidad solo se invalida si algún producto cambió
+
+def actualizar_disponibilidad(ingrediente_ids):
+    agotados = list(
+        Ingrediente.objects.filter(pk__in=ingrediente_ids).con_existencias()
+        .filter(existencias=0).values_list('pk', flat=True)
+    )
+    if agotados and Producto.objects.con_ingredientes(agotados).recalcular_disponible():
+        transaction.on_commit(invalidar_stock)
+
+
+# Paso 5: Modelo de Pedido
+# Un pedido agrupa varias ventas (una por producto) de un mismo cliente
+# Se valida el inventario de toda la canasta y se descuenta en una sola transacción
+
+class PedidoManager(models.Manager):
+    def crear(self, usuario, lineas):
+        """Crea un pedido a partir de una lista de (producto, cantidad)"""
+        # Agrupar cantidades por producto (el cliente puede repetir productos)
+        cantidades = {}
+        productos = {}
+        for producto, cantidad in lineas:
+            cantidades[producto.pk] = cantidades.get(producto.pk, 0) + cantidad
+            productos[producto.pk] = producto
+        
+        # Verificación previa sin consultas: algún producto ya está agotado
+        if not all(producto.disponible for producto in productos.values()):
+            raise InventarioInsuficiente('No hay inventario suficiente para el pedido.')
+        
+        # Una sola consulta: ingredientes de toda la canasta con su inventario
+        requeridos = {}
+        inventario = {}
+        fragmentados = {}
+        relaciones = list(ProductoIngrediente.objects.filter(
+            producto_id__in=cantidades
+        ).values_list('ingrediente_id', 'ingrediente__inventario', 'producto_id', 'ingrediente__fragmentos'))
+        for ingrediente_id, disponible, producto_id, fragmentos in relaciones:
+            requeridos[ingrediente_id] = requeridos.get(ingrediente_id, 0) + cantidades[producto_id]
+            inventario[ingrediente_id] = disponible
+            if fragmentos:
+                fragmentados[ingrediente_id] = fragmentos
+        
+        # Los ingredientes fragmentados suman lo repartido en sus fragmentos
+        if fragmentados:
+            repartido = FragmentoInventario.objects.filter(
+                ingrediente_id__in=fragmentados
+            ).values('ingrediente_id').annotate(total=Sum('cantidad')).values_list('ingrediente_id', 'total')
+            for ingrediente_id, total in repartido:
+                inventario[ingrediente_id] += total
+        
+        for ingrediente_id, cantidad in requeridos.items():
+            if inventario[ingrediente_id] < cantidad:
+                raise InventarioInsuficiente('No hay inventario suficiente para el pedido.')
+        
+        with transaction.atomic():
+            pedido = self.create(
+                usuario=usuario,
+                total=sum(productos[pk].precio_publico * cantidad for pk, cantidad in cantidades.items())
+            )
+            
+            # Todas las líneas en un solo INSERT (no pasa por Venta.save)
+            ventas = Venta.objects.bulk_create([
+                Venta(
+                    pedido=pedido,
+                    producto=productos[pk],
+                    usuario=usuario,
+                    cantidad=cantidad,
+                    total=productos[pk].precio_publico * cantidad
+                )
+                for pk, cantidad in cantidades.items()
+            ])
+            
+            # Todos los ingredientes afectados en un solo UPDATE
+            # (los fragmentados descuentan de sus fragmentos, en orden de id)
+            if requeridos:
+                try:
+                    with transaction.atomic():
+                        Ingrediente.objects.filter(pk__in=requeridos, fragmentos=0).update(
+                            inventario=F('inventario') - Case(
+                                *[When(pk=pk, then=Value(cantidad)) for pk, cantidad in requeridos.items()],
+                                default=Value(0)
+                            )
+                        )
+                        for ingrediente_id in sorted(fragmentados):
+                            FragmentoInventario.objects.descontar(
+                                ingrediente_id, fragmentados[ingrediente_id], requeridos[ingrediente_id]
+                            )
+                except IntegrityError:
+                    # Otra venta se llevó el stock entre la validación y el descuento
+                    raise InventarioInsuficiente('No hay inventario suficiente para el pedido.')
+                
+                # Un movimiento por ingrediente de cada línea, en un solo INSERT
+                venta_por_producto = {venta.producto_id: venta for venta in ventas}
+                InventarioMovimiento.objects.bulk_create([
+                    InventarioMovimiento(
+                        ingrediente_id=ingrediente_id, tipo='VENTA',
+                        cantidad=-cantidades[producto_id], venta=venta_por_producto[producto_id]
+                    )
+                    for ingrediente_id, _, producto_id, _ in relaciones
+                ])
+                actualizar_disponibilidad(requeridos)
+            
+            # Acumular el resumen diario (una fila por producto del pedido)
+            dia = timezone.localdate(pedido.fecha)
+            for pk, cantidad in cantidades.items():
+                VentaDiaria.objects.registrar(
+                    dia, pk, cantidad, productos[pk].precio_publico * cantidad
+                )
+            
+            # bulk_create no dispara señales: el total gastado del cliente se borra a mano
+            transaction.on_commit(lambda: invalidar_total_gastado(usuario.pk))
+        
+        return pedido
+
+
+class Pedido(models.Model):
+    usuario = models.ForeignKey(
+        Usuario,
+        on_delete=models.CASCADE,
+        related_name='pedidos',
+        verbose_name='Usuario'
+    )
+    total = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        validators=[MinValueValidator(0)],
+        verbose_name='Total'
+    )
+    fecha = models.DateTimeField(auto_now_add=True, verbose_name='Fecha')
+    
+    objects = PedidoManager()
+    
+    class Meta:
+        verbose_name = 'Pedido'
+        verbose_name_plural = 'Pedidos'
+        ordering = ['-fecha']
+        # Orden y filtros por periodo del admin (rangos de fecha)
+        indexes = [
+            models.Index(fields=['fecha'], name='pedido_fecha_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Pedido #{self.id} - {self.usuario.username} - ${self.total}"
+
+
+# Paso 6: Modelo de Venta
 # Registra cada venta que se hace en la heladería
 # Guarda: qué se vendió, quién compró, cuánto pagó y cuándo
 
+# QuerySet de ventas con filtros por rango de fechas que aprovechan los índices
+
+class VentaQuerySet(models.QuerySet):
+    def entre(self, inicio, fin):
+        """Ventas en el rango semiabierto [inicio, fin)"""
+        return self.filter(fecha__gte=inicio, fecha__lt=fin)
+    
+    def del_periodo(self, periodo, dia=None):
+        """Ventas de hoy, esta semana o este mes (hora local)"""
+        return self.entre(*rango_periodo(periodo, dia))
+
+
 class Venta(models.Model):
     producto = models.ForeignKey(
         Producto,
@@ -200,6 +702,15 @@ class Venta(models.Model):
         related_name='ventas',
         verbose_name='Usuario'
     )
+    # Pedido al que pertenece la venta (vacío en ventas de un solo producto)
+    pedido = models.ForeignKey(
+        Pedido,
+        on_delete=models.CASCADE,
+        related_name='lineas',
+        blank=True,
+        null=True,
+        verbose_name='Pedido'
+    )
     cantidad = models.PositiveIntegerField(
         default=1,
         validators=[MinValueValidator(1)],
@@ -213,22 +724,262 @@ class Venta(models.Model):
     )
     fecha = models.DateTimeField(auto_now_add=True, verbose_name='Fecha')
     
+    objects = VentaQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Venta'
         verbose_name_plural = 'Ventas'
         ordering = ['-fecha']  # Ordena por fecha descendente (más recientes primero)
+        # Índices para filtrar por rango de fechas y para el historial de cada usuario
+        indexes = [
+            models.Index(fields=['fecha'], name='venta_fecha_idx'),
+            models.Index(fields=['usuario', 'fecha'], name='venta_usuario_fecha_idx'),
+        ]
     
     def __str__(self):
         return f"Venta #{self.id} - {self.producto.nombre} - ${self.total}"
     
     # Método que se ejecuta automáticamente al guardar una venta
-    # Descuenta el inventario de los ingredientes
+    # Descuenta el inventario de los ingredientes en la misma transacción
+    # Lanza InventarioInsuficiente si no alcanza el stock (no se guarda nada)
     def save(self, *args, **kwargs):
-        # Solo descuenta inventario cuando se crea la venta (no al actualizarla)
-        if not self.pk:
-            for ingrediente in self.producto.ingredientes.all():
-                if ingrediente.inventario > 0:
-                    ingrediente.inventario -= self.cantidad
-                    ingrediente.save()
-        
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            es_nueva = not self.pk
+            
+            super().save(*args, **kwargs)
+            
+            # Solo descuenta inventario cuando se crea la venta (no al actualizarla)
+            # Si no alcanza, la excepción revierte también el INSERT de la venta
+            if es_nueva:
+                self.producto.descontar_inventario(self.cantidad, venta=self)
+            
+            # Acumular la venta en el resumen diario
+            if es_nueva:
+                VentaDiaria.objects.registrar(
+                    timezone.localdate(self.fecha), self.producto_id, self.cantidad, self.total
+                )
+
+
+# Paso 7: Resumen diario de ventas
+# Una fila por día y producto, actualizada en la misma transacción que cada venta
+# El dashboard y el historial leen de aquí en vez de recorrer todas las ventas
+
+class VentaDiariaManager(models.Manager):
+    def registrar(self, fecha, producto_id, cantidad, total, ventas=1):
+        """Suma una venta (o varias) al resumen del día"""
+        incrementos = {
+            'cantidad': F('cantidad') + cantidad,
+            'total': F('total') + total,
+            'ventas': F('ventas') + ventas,
+        }
+        if self.filter(fecha=fecha, producto_id=producto_id).update(**incrementos):
+            return
+        try:
+            with transaction.atomic():
+                self.create(
+                    fecha=fecha, producto_id=producto_id,
+                    cantidad=cantidad, total=total, ventas=ventas
+                )
+        except IntegrityError:
+            # Otra venta creó la fila del día al mismo tiempo
+            self.filter(fecha=fecha, producto_id=producto_id).update(**incrementos)
+
+
+class VentaDiaria(models.Model):
+    fecha = models.DateField(verbose_name='Fecha')
+    producto = models.ForeignKey(
+        Producto,
+        on_delete=models.CASCADE,
+        related_name='ventas_diarias',
+        verbose_name='Producto'
+    )
+    cantidad = models.PositiveIntegerField(default=0, verbose_name='Unidades vendidas')
+    total = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        verbose_name='Total'
+    )
+    ventas = models.PositiveIntegerField(default=0, verbose_name='Número de ventas')
+    
+    objects = VentaDiariaManager()
+    
+    class Meta:
+        verbose_name = 'Venta diaria'
+        verbose_name_plural = 'Ventas diarias'
+        ordering = ['-fecha']
+        unique_together = ['fecha', 'producto']
+    
+    def __str__(self):
+        return f"{self.fecha} - {self.producto.nombre} - ${self.total}"
+
+
+# Paso 8: Libro de movimientos de inventario
+# Cada cambio de inventario (venta, reposición, ajuste) se anota como una fila nueva
+# que nunca se modifica. El stock según el libro es el último punto de control
+# más la suma de los movimientos posteriores (Ingrediente.objects.con_stock_al)
+# compactar_inventario resume los movimientos viejos en puntos de control diarios
+# El libro es solo de auditoría: el saldo que se descuenta y se bloquea en cada venta
+# sigue siendo Ingrediente.inventario (o sus fragmentos, Paso 9), así que no reduce la
+# contención; cada venta hace un INSERT más
+
+class InventarioMovimientoManager(models.Manager):
+    def registrar_ajustes(self, cambios):
+        """Anota (ingrediente_id, antes, despues): REPOSICION si sube, AJUSTE si baja"""
+        return self.bulk_create([
+            self.model(
+                ingrediente_id=ingrediente_id,
+                tipo='REPOSICION' if despues > antes else 'AJUSTE',
+                cantidad=despues - antes,
+            )
+            for ingrediente_id, antes, despues in cambios
+            if despues != antes
+        ])
+
+
+class InventarioMovimiento(models.Model):
+    TIPO_CHOICES = [
+        ('VENTA', 'Venta'),
+        ('REPOSICION', 'Reposición'),
+        ('AJUSTE', 'Ajuste'),
+    ]
+    
+    ingrediente = models.ForeignKey(
+        Ingrediente,
+        on_delete=models.CASCADE,
+        related_name='movimientos',
+        verbose_name='Ingrediente'
+    )
+    tipo = models.CharField(max_length=15, choices=TIPO_CHOICES, verbose_name='Tipo')
+    # Positivo entra, negativo sale
+    cantidad = models.IntegerField(verbose_name='Cantidad')
+    fecha = models.DateTimeField(default=timezone.now, verbose_name='Fecha')
+    venta = models.ForeignKey(
+        Venta,
+        on_delete=models.SET_NULL,
+        related_name='movimientos',
+        blank=True,
+        null=True,
+        verbose_name='Venta'
+    )
+    
+    objects = InventarioMovimientoManager()
+    
+    class Meta:
+        verbose_name = 'Movimiento de inventario'
+        verbose_name_plural = 'Movimientos de inventario'
+        ordering = ['-fecha']
+        indexes = [
+            models.Index(fields=['ingrediente', 'fecha'], name='movimiento_ingrediente_idx'),
+            models.Index(fields=['fecha'], name='movimiento_fecha_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_tipo_display()} {self.cantidad:+d} {self.ingrediente.nombre}"
+
+
+class InventarioCheckpoint(models.Model):
+    """Stock de un ingrediente en `fecha`: incluye todos los movimientos anteriores a esa fecha"""
+    ingrediente = models.ForeignKey(
+        Ingrediente,
+        on_delete=models.CASCADE,
+        related_name='checkpoints',
+        verbose_name='Ingrediente'
+    )
+    fecha = models.DateTimeField(verbose_name='Fecha')
+    saldo = models.IntegerField(verbose_name='Saldo')
+    
+    class Meta:
+        verbose_name = 'Punto de control de inventario'
+        verbose_name_plural = 'Puntos de control de inventario'
+        ordering = ['-fecha']
+        unique_together = ['ingrediente', 'fecha']
+    
+    def __str__(self):
+        return f"{self.ingrediente.nombre} {self.fecha:%Y-%m-%d}: {self.saldo}"
+
+
+# Paso 9: Contadores de inventario fragmentados (opcional)
+# Para ingredientes que están en casi todos los productos (las bases de vainilla y chocolate)
+# Su stock se reparte en N filas; cada venta descuenta de una al azar que tenga stock
+# Cuando ningún fragmento alcanza, se rebalancea con el ingrediente bloqueado
+# Se activa por ingrediente con: python manage.py fragmentar_inventario <nombre> --fragmentos 8
+
+class FragmentoInventarioManager(models.Manager):
+    def descontar(self, ingrediente_id, fragmentos, cantidad):
+        """Descuenta de un fragmento con stock (empezando por uno al azar)"""
+        inicio = random.randrange(fragmentos)
+        for paso in range(fragmentos):
+            numero = (inicio + paso) % fragmentos
+            # UPDATE condicional: si el fragmento no alcanza no toca nada y se prueba el siguiente
+            if self.filter(
+                ingrediente_id=ingrediente_id, numero=numero, cantidad__gte=cantidad
+            ).update(cantidad=F('cantidad') - cantidad):
+                return
+        # Ningún fragmento alcanza por sí solo: juntar y repartir de nuevo
+        self.rebalancear(ingrediente_id, descontar=cantidad)
+    
+    def rebalancear(self, ingrediente_id, descontar=0):
+        """
+        Junta el inventario sin repartir y todos los fragmentos, descuenta `descontar`
+        y reparte el resto en partes iguales. Bloquea el ingrediente y sus fragmentos.
+        """
+        with transaction.atomic():
+            ingrediente = Ingrediente.objects.select_for_update().get(pk=ingrediente_id)
+            fragmentos = list(self.select_for_update().filter(ingrediente_id=ingrediente_id).order_by('numero'))
+            total = ingrediente.inventario + sum(fragmento.cantidad for fragmento in fragmentos)
+            if total < descontar:
+                raise InventarioInsuficiente(f'No hay inventario suficiente de {ingrediente.nombre}.')
+            total -= descontar
+            
+            if not fragmentos:
+                Ingrediente.objects.filter(pk=ingrediente_id).update(inventario=total)
+                return
+            parte, resto = divmod(total, len(fragmentos))
+            for indice, fragmento in enumerate(fragmentos):
+                fragmento.cantidad = parte + (1 if indice < resto else 0)
+            self.bulk_update(fragmentos, ['cantidad'])
+            Ingrediente.objects.filter(pk=ingrediente_id).update(inventario=0)
+    
+    def configurar(self, ingrediente_id, fragmentos):
+        """Cambia el número de fragmentos (0 = volver a un solo contador) conservando el stock"""
+        with transaction.atomic():
+            ingrediente = Ingrediente.objects.select_for_update().get(pk=ingrediente_id)
+            actuales = self.select_for_update().filter(ingrediente_id=ingrediente_id)
+            total = ingrediente.inventario + (actuales.aggregate(total=Sum('cantidad'))['total'] or 0)
+            actuales.delete()
+            # update() para no pasar por Ingrediente.save (el stock total no cambia)
+            Ingrediente.objects.filter(pk=ingrediente_id).update(inventario=total, fragmentos=fragmentos)
+            if fragmentos:
+                self.bulk_create([
+                    self.model(ingrediente_id=ingrediente_id, numero=numero, cantidad=0)
+                    for numero in range(fragmentos)
+                ])
+                self.rebalancear(ingrediente_id)
+
+
+class FragmentoInventario(models.Model):
+    ingrediente = models.ForeignKey(
+        Ingrediente,
+        on_delete=models.CASCADE,
+        related_name='fragmentos_inventario',
+        verbose_name='Ingrediente'
+    )
+    numero = models.PositiveSmallIntegerField(verbose_name='Número')
+    cantidad = models.PositiveIntegerField(default=0, verbose_name='Cantidad')
+    
+    objects = FragmentoInventarioManager()
+    
+    class Meta:
+        verbose_name = 'Fragmento de inventario'
+        verbose_name_plural = 'Fragmentos de inventario'
+        unique_together = ['ingrediente', 'numero']
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(cantidad__gte=0),
+                name='fragmento_inventario_no_negativo'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.ingrediente.nombre} #{self.numero}: {self.cantidad}"
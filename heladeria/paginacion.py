@@ -0,0 +1,68 @@
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+
+# Paginación por cursor (keyset) sobre (fecha, id)
+# A diferencia de OFFSET, cada página cuesta lo mismo sin importar qué tan atrás esté
+
+def codificar_cursor(objeto):
+    """Convierte la (fecha, id) de un objeto en un cursor opaco para la URL"""
+    datos = json.dumps([objeto.fecha.isoformat(), objeto.pk])
+    return base64.urlsafe_b64encode(datos.encode()).decode()
+
+
+def decodificar_cursor(cursor):
+    """Devuelve (fecha, id) o None si el cursor no es válido"""
+    try:
+        fecha, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(fecha), int(pk)
+    except (ValueError, TypeError):
+        return None
+
+
+def paginar_por_cursor(request, queryset, por_pagina=50):
+    """
+    Devuelve una página de objetos ordenados del más reciente al más antiguo.
+    
+    Usa los parámetros ?despues=<cursor> (página siguiente) y ?antes=<cursor>
+    (página anterior) y arma los enlaces conservando los demás parámetros.
+    """
+    despues = decodificar_cursor(request.GET.get('despues', ''))
+    antes = decodificar_cursor(request.GET.get('antes', ''))
+    
+    if antes:
+        # Página anterior: los siguientes más recientes que el cursor, en orden ascendente
+        fecha, pk = antes
+        filas = list(
+            queryset.filter(Q(fecha__gt=fecha) | Q(fecha=fecha, pk__gt=pk))
+            .order_by('fecha', 'pk')[:por_pagina + 1]
+        )
+        hay_anterior = len(filas) > por_pagina
+        objetos = filas[:por_pagina][::-1]
+        hay_siguiente = True
+    else:
+        if despues:
+            fecha, pk = despues
+            queryset = queryset.filter(Q(fecha__lt=fecha) | Q(fecha=fecha, pk__lt=pk))
+        filas = list(queryset.order_by('-fecha', '-pk')[:por_pagina + 1])
+        hay_siguiente = len(filas) > por_pagina
+        objetos = filas[:por_pagina]
+        hay_anterior = despues is not None
+    
+    pagina = {'objetos': objetos, 'siguiente': None, 'anterior': None}
+    if objetos and hay_siguiente:
+        pagina['siguiente'] = _url_pagina(request, 'despues', codificar_cursor(objetos[-1]))
+    if objetos and hay_anterior:
+        pagina['anterior'] = _url_pagina(request, 'antes', codificar_cursor(objetos[0]))
+    return pagina
+
+
+def _url_pagina(request, parametro, cursor):
+    parametros = request.GET.copy()
+    parametros.pop('antes', None)
+    parametros.pop('despues', None)
+    parametros[parametro] = cursor
+    return f'?{parametros.urlencode()}'
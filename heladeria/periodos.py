@@ -0,0 +1,52 @@
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+
+# Periodos de ventas disponibles
+PERIODOS = [
+    ('hoy', 'Hoy'),
+    ('semana', 'Esta semana'),
+    ('mes', 'Este mes'),
+]
+
+
+def inicio_del_dia(dia):
+    """Convierte una fecha local en el datetime (con zona horaria) de su medianoche"""
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+def rango_periodo(periodo, dia=None):
+    """
+    Devuelve el rango semiabierto [inicio, fin) en hora local para un periodo.
+    
+    Filtrar con fecha__gte=inicio y fecha__lt=fin permite usar el índice de
+    Venta.fecha, a diferencia de fecha__date que convierte la zona horaria fila por fila.
+    """
+    dia = dia or timezone.localdate()
+    
+    if periodo == 'hoy':
+        desde = dia
+        hasta = dia + timedelta(days=1)
+    elif periodo == 'semana':
+        # La semana empieza el lunes
+        desde = dia - timedelta(days=dia.weekday())
+        hasta = desde + timedelta(days=7)
+    elif periodo == 'mes':
+        desde = dia.replace(day=1)
+        hasta = (desde + timedelta(days=32)).replace(day=1)
+    else:
+        raise ValueError(f'Periodo desconocido: {periodo}')
+    
+    return inicio_del_dia(desde), inicio_del_dia(hasta)
+
+
+def rango_fechas(desde=None, hasta=None):
+    """
+    Convierte fechas locales (ambas incluidas, opcionales) en el rango [inicio, fin).
+    
+    Devuelve None en el extremo que no se indique.
+    """
+    inicio = inicio_del_dia(desde) if desde else None
+    fin = inicio_del_dia(hasta + timedelta(days=1)) if hasta else None
+    return inicio, fin
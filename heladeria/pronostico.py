@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from .models import Ingrediente, ProductoIngrediente
+
+
+# Pronóstico de agotamiento de ingredientes
+# El consumo diario de cada ingrediente sale de una sola consulta agrupada: las unidades
+# vendidas por día (VentaDiaria, el resumen de Venta) unidas con las recetas
+# (ProductoIngrediente). Se guarda en caché durante PRONOSTICO_CACHE_TIMEOUT (o hasta la
+# siguiente corrida de pronosticar_inventario, si la caché es compartida); el stock se lee
+# al momento de mostrar el reporte
+
+CLAVE_CONSUMO = 'heladeria:pronostico:consumo'
+
+# Ventana corta: si el consumo reciente es mayor que el promedio, manda el reciente
+DIAS_CORTO = 7
+
+
+def calcular_consumo(dias=28):
+    """
+    Consumo diario de cada ingrediente en los últimos `dias` días completos (sin hoy)
+    y en los últimos DIAS_CORTO (dias >= 1). Guarda el resultado en caché.
+    """
+    hoy = timezone.localdate()
+    inicio = hoy - timedelta(days=dias)
+    corto = hoy - timedelta(days=min(DIAS_CORTO, dias))
+    filas = (
+        ProductoIngrediente.objects.filter(
+            producto__ventas_diarias__fecha__gte=inicio,
+            producto__ventas_diarias__fecha__lt=hoy,
+        )
+        .values('ingrediente_id')
+        .annotate(
+            largo=Sum('producto__ventas_diarias__cantidad'),
+            corto=Sum('producto__ventas_diarias__cantidad', filter=Q(producto__ventas_diarias__fecha__gte=corto)),
+        )
+        .order_by()
+    )
+    consumo = {
+        fila['ingrediente_id']: max(fila['largo'] / dias, (fila['corto'] or 0) / min(DIAS_CORTO, dias))
+        for fila in filas
+    }
+    datos = {'generado': timezone.now(), 'dias': dias, 'consumo': consumo}
+    cache.set(CLAVE_CONSUMO, datos, settings.PRONOSTICO_CACHE_TIMEOUT)
+    return datos
+
+
+def consumo_actual():
+    """Consumo de la última corrida (si no hay, se calcula ahora)"""
+    return cache.get(CLAVE_CONSUMO) or calcular_consumo()
+
+
+def fecha_agotamiento(hoy, dias_restantes):
+    """Día en que se agota; None sin consumo o si cae después de date.max"""
+    if dias_restantes is None or dias_restantes >= (date.max - hoy).days:
+        return None
+    return hoy + timedelta(days=int(dias_restantes))
+
+
+def pronostico(umbral=None):
+    """
+    Días hasta agotar cada ingrediente con su stock actual y el consumo calculado.
+    Con `umbral` (días) solo los que se agotan antes. Ordenado del más urgente al menos urgente;
+    los agotados van primero (0 días) y los que no tienen consumo al final (dias_restantes None).
+    """
+    datos = consumo_actual()
+    hoy = timezone.localdate()
+    filas = []
+    for pk, nombre, tipo, existencias in (
+        Ingrediente.objects.con_existencias().values_list('pk', 'nombre', 'tipo', 'existencias')
+    ):
+        consumo = datos['consumo'].get(pk, 0)
+        if existencias == 0:
+            dias_restantes = 0
+        else:
+            dias_restantes = existencias / consumo if consumo else None
+        if umbral is not None and (dias_restantes is None or dias_restantes > umbral):
+            continue
+        filas.append({
+            'id': pk,
+            'nombre': nombre,
+            'tipo': tipo,
+            'existencias': existencias,
+            'consumo_diario': round(consumo, 2),
+            'dias_restantes': None if dias_restantes is None else round(dias_restantes, 1),
+            'agotamiento': fecha_agotamiento(hoy, dias_restantes),
+        })
+    filas.sort(key=lambda fila: (fila['dias_restantes'] is None, fila['dias_restantes'] or 0, fila['nombre']))
+    return datos, filas
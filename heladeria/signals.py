@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .backends import clave_usuario
+from .cache import invalidar_catalogo, invalidar_total_gastado
+from .models import Usuario, Ingrediente, Producto, ProductoIngrediente, Venta, VentaDiaria
+
+
+# Al borrar una venta (por ejemplo desde el admin) se descuenta del resumen diario
+@receiver(post_delete, sender=Venta)
+def descontar_venta_diaria(sender, instance, **kwargs):
+    VentaDiaria.objects.filter(
+        fecha=timezone.localdate(instance.fecha),
+        producto_id=instance.producto_id
+    ).update(
+        cantidad=F('cantidad') - instance.cantidad,
+        total=F('total') - instance.total,
+        ventas=F('ventas') - 1
+    )
+
+
+# Una venta nueva o borrada cambia el total gastado de su cliente
+@receiver(post_save, sender=Venta)
+@receiver(post_delete, sender=Venta)
+def invalidar_total_gastado_por_venta(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidar_total_gastado(instance.usuario_id))
+
+
+# Cualquier cambio en productos, ingredientes o recetas invalida el catálogo en caché
+# Se hace al confirmar la transacción para que nadie vuelva a cachear datos viejos
+@receiver(post_save, sender=Producto)
+@receiver(post_delete, sender=Producto)
+@receiver(post_save, sender=Ingrediente)
+@receiver(post_delete, sender=Ingrediente)
+@receiver(post_save, sender=ProductoIngrediente)
+@receiver(post_delete, sender=ProductoIngrediente)
+def invalidar_catalogo_por_cambio(sender, **kwargs):
+    transaction.on_commit(invalidar_catalogo)
+
+
+@receiver(m2m_changed, sender=Producto.ingredientes.through)
+def invalidar_catalogo_por_receta(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(invalidar_catalogo)
+
+
+# Un cambio de receta cambia los datos guardados del producto (disponible, costo y
+# calorias_totales). Se recalculan dentro de la misma transacción que el cambio
+@receiver(m2m_changed, sender=Producto.ingredientes.through)
+def recalcular_productos_por_receta(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        Producto.objects.filter(pk=instance.pk).recalcular_receta()
+    elif pk_set:
+        # ingrediente.productos.add(...): pk_set son productos
+        Producto.objects.filter(pk__in=pk_set).recalcular_receta()
+    elif action == 'post_clear':
+        # ingrediente.productos.clear(): ya no se sabe cuáles eran, se recalculan todos
+        Producto.objects.all().recalcular_receta()
+
+
+# Una relación a la vez (admin, shell). Las cargas masivas (importar_catalogo) no pasan
+# por aquí: borran con _raw_delete y recalculan todos sus productos con una consulta
+@receiver(post_save, sender=ProductoIngrediente)
+@receiver(post_delete, sender=ProductoIngrediente)
+def recalcular_productos_por_relacion(sender, instance, **kwargs):
+    Producto.objects.filter(pk=instance.producto_id).recalcular_receta()
+
+
+# Al cambiar un usuario (rol, contraseña, activo...) se borra su copia en caché
+@receiver(post_save, sender=Usuario)
+@receiver(post_delete, sender=Usuario)
+def invalidar_usuario(sender, instance, **kwargs):
+    cache.delete(clave_usuario(instance.pk))
@@ -0,0 +1,58 @@
+import logging
+
+from django.conf import settings
+from django.test import TransactionTestCase
+
+from heladeria.consultas import SUPERUSUARIO, TAMANOS, contar, modelos_admin, reportar
+
+
+class PresupuestoConsultasTests(TransactionTestCase):
+    """
+    Consultas por ruta y rol (settings.PRESUPUESTOS_RUTAS) con datos pequeños y grandes.
+    TransactionTestCase: las ventas y pedidos se confirman como en producción (con sus on_commit).
+    La tabla completa se ve con: python manage.py verificar_consultas
+    """
+
+    LOGGERS = ['heladeria.medicion', 'django.request']
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Sin una línea de log por petición
+        cls.niveles = {nombre: logging.getLogger(nombre).level for nombre in cls.LOGGERS}
+        for nombre in cls.LOGGERS:
+            logging.getLogger(nombre).setLevel(logging.ERROR)
+        cls.conteos = {tamano: contar(tamano) for tamano in TAMANOS}
+        cls.filas = reportar(cls.conteos)
+
+    @classmethod
+    def tearDownClass(cls):
+        for nombre, nivel in cls.niveles.items():
+            logging.getLogger(nombre).setLevel(nivel)
+        super().tearDownClass()
+
+    def test_rutas_dentro_del_presupuesto(self):
+        for ruta, rol, (frio_p, _), (frio_g, _), limite, _ in self.filas:
+            with self.subTest(ruta=ruta, rol=rol):
+                self.assertLessEqual(max(frio_p, frio_g), limite)
+
+    def test_consultas_no_crecen_con_los_datos(self):
+        for ruta, rol, pequeno, grande, _, _ in self.filas:
+            with self.subTest(ruta=ruta, rol=rol):
+                self.assertLessEqual(grande[0], pequeno[0], 'caché fría: N+1')
+                self.assertLessEqual(grande[1], pequeno[1], 'caché caliente: N+1')
+
+    def test_listas_del_admin(self):
+        """Cada modelo de heladeria en el admin tiene su propio presupuesto y lo cumple"""
+        modelos = modelos_admin()
+        self.assertTrue(modelos)
+        for modelo in modelos:
+            ruta = f'admin_{modelo._meta.model_name}'
+            with self.subTest(ruta=ruta):
+                self.assertIn('consultas', settings.PRESUPUESTOS_RUTAS.get(ruta, {}))
+                limite = settings.PRESUPUESTOS_RUTAS[ruta]['consultas']
+                frio_p, caliente_p = self.conteos['pequeno'][(ruta, SUPERUSUARIO)]
+                frio_g, caliente_g = self.conteos['grande'][(ruta, SUPERUSUARIO)]
+                self.assertLessEqual(max(frio_p, frio_g), limite)
+                self.assertLessEqual(frio_g, frio_p, 'N+1 en la lista del admin')
+                self.assertLessEqual(caliente_g, caliente_p, 'N+1 en la lista del admin')
@@ -0,0 +1,36 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from heladeria.management.commands.verificar_indices import consultas_con_indice, planes
+from heladeria.models import Ingrediente, Producto, Usuario, Venta
+
+
+class IndicesVentasTests(TestCase):
+    """Los filtros de ventas por periodo usan los índices de fecha (según EXPLAIN)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        ingredientes = [
+            Ingrediente.objects.create(
+                nombre=f'Índice {i}', precio=Decimal('1.00'), calorias=100, inventario=100,
+                tipo='BASE' if i == 0 else 'COMPLEMENTO',
+            )
+            for i in range(Producto.NUM_INGREDIENTES)
+        ]
+        producto = Producto.objects.create(nombre='Copa índice', precio_publico=Decimal('5.00'), tipo='COPA')
+        producto.ingredientes.set(ingredientes)
+        cls.usuario = Usuario.objects.create_user(username='indices', password='x', rol='CLIENTE')
+        for _ in range(3):
+            Venta(producto=producto, usuario=cls.usuario, cantidad=1, total=producto.precio_publico).save()
+
+    def test_filtros_por_periodo_usan_indices(self):
+        resultados = planes(self.usuario)
+        # Todas las verificaciones corren: ninguna se omite por falta de datos
+        self.assertEqual(len(resultados), len(consultas_con_indice(self.usuario)))
+        self.assertEqual(
+            {indice for indice, _ in resultados}, {'venta_fecha_idx', 'venta_usuario_fecha_idx'}
+        )
+        for indice, plan in resultados:
+            with self.subTest(indice=indice):
+                self.assertIn(indice, plan)
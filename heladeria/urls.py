@@ -1,9 +1,20 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Catálogo público: vistas asíncronas si se despliega con ASGI (CATALOGO_ASYNC=True)
+if settings.CATALOGO_ASYNC:
+    vista_home = views.home_async
+    vista_producto_lista = views.producto_lista_async
+    vista_producto_detalle = views.producto_detalle_async
+else:
+    vista_home = views.home
+    vista_producto_lista = views.producto_lista
+    vista_producto_detalle = views.producto_detalle
+
 urlpatterns = [
     # Rutas públicas
-    path('', views.home, name='home'),
+    path('', vista_home, name='home'),
     path('login/', views.login_view, name='login'),
     path('registro/', views.registro_view, name='registro'),
     path('logout/', views.logout_view, name='logout'),
@@ -12,21 +23,28 @@ urlpatterns = [
     path('dashboard/', views.dashboard, name='dashboard'),
     
     # Productos (públicos y con permisos)
-    path('productos/', views.producto_lista, name='producto_lista'),
-    path('productos/<int:pk>/', views.producto_detalle, name='producto_detalle'),
+    path('productos/', vista_producto_lista, name='producto_lista'),
+    path('productos/<int:pk>/', vista_producto_detalle, name='producto_detalle'),
     path('productos/crear/', views.producto_crear, name='producto_crear'),
     path('productos/<int:pk>/editar/', views.producto_editar, name='producto_editar'),
     path('productos/<int:pk>/eliminar/', views.producto_eliminar, name='producto_eliminar'),
     path('productos/rentable/', views.producto_mas_rentable, name='producto_rentable'),
     
+    # API JSON del catálogo (pública, solo lectura)
+    path('api/v1/catalogo/', views.api_catalogo, name='api_catalogo'),
+    
     # Ingredientes (solo empleados y admin)
     path('ingredientes/', views.ingrediente_lista, name='ingrediente_lista'),
+    path('ingredientes/pronostico/', views.ingrediente_pronostico, name='ingrediente_pronostico'),
     path('ingredientes/crear/', views.ingrediente_crear, name='ingrediente_crear'),
     path('ingredientes/<int:pk>/editar/', views.ingrediente_editar, name='ingrediente_editar'),
     path('ingredientes/<int:pk>/eliminar/', views.ingrediente_eliminar, name='ingrediente_eliminar'),
     
     # Ventas
     path('ventas/crear/', views.venta_crear, name='venta_crear'),
+    path('pedidos/crear/', views.pedido_crear, name='pedido_crear'),
     path('ventas/', views.venta_lista, name='venta_lista'),
+    path('ventas/exportar/', views.venta_exportar, name='venta_exportar'),
+    path('ventas/analitica/', views.venta_analitica, name='venta_analitica'),
     path('mis-compras/', views.mis_compras, name='mis_compras'),
 ]
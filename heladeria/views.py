@@ -1,12 +1,28 @@
+from django.conf import settings
+from django.core.cache import cache
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse, HttpResponseBadRequest
+from django.views.decorators.cache import cache_control
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition, require_GET
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.db.models import Sum, F
+from django.db.models import Sum, F, Q
 from django.utils import timezone
-from datetime import datetime
-from .models import Usuario, Ingrediente, Producto, Venta
-from .forms import RegistroForm, IngredienteForm, ProductoForm, VentaForm
+from asgiref.sync import sync_to_async
+from hashlib import md5
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+from .models import Usuario, Ingrediente, Producto, Venta, VentaDiaria, Pedido, InventarioInsuficiente
+from .periodos import PERIODOS, rango_fechas
+from .analitica import AGRUPACIONES, GRANULARIDADES, MAX_DIAS, resumen_ventas
+from .pronostico import pronostico
+from .exportacion import FORMATOS, filas_ventas, generar_exportacion
+from .paginacion import paginar_por_cursor
+from .cache import aversion_catalogo, cache_compartida, clave_total_gastado, ultima_modificacion, version_catalogo, version_stock
+from .catalogo import aproductos_catalogo, astock_productos, catalogo_json, productos_catalogo, stock_productos
+from .forms import RegistroForm, IngredienteForm, ProductoForm, VentaForm, LineaPedidoFormSet
 
 
 # Funciones auxiliares para verificar roles
@@ -24,8 +40,13 @@ def es_cliente(user):
 
 def home(request):
     """Página principal - Lista de productos (acceso público)"""
-    productos = Producto.objects.all()
-    return render(request, 'heladeria/home.html', {'productos': productos})
+    # Productos desde la caché del catálogo (se invalida al cambiar productos o ingredientes)
+    context = {
+        'productos': productos_catalogo(),
+        'version_catalogo': version_catalogo(),
+        'cache_timeout': settings.CATALOGO_CACHE_TIMEOUT
+    }
+    return render(request, 'heladeria/home.html', context)
 
 
 def login_view(request):
@@ -79,47 +100,59 @@ def dashboard(request):
     }
     
     # Si es administrador, mostrar estadísticas adicionales
+    # Se leen del resumen diario: una sola consulta sobre las filas de hoy
     if es_administrador(request.user):
-        context['total_ventas_hoy'] = Venta.objects.filter(
-            fecha__date=timezone.now().date()
-        ).aggregate(total=Sum('total'))['total'] or 0
-        
-        context['ventas_hoy'] = Venta.objects.filter(
-            fecha__date=timezone.now().date()
-        ).count()
+        hoy = VentaDiaria.objects.filter(fecha=timezone.localdate()).aggregate(
+            total_hoy=Sum('total'), cantidad_hoy=Sum('ventas')
+        )
+        context['total_ventas_hoy'] = hoy['total_hoy'] or 0
+        context['ventas_hoy'] = hoy['cantidad_hoy'] or 0
     
     return render(request, 'heladeria/dashboard.html', context)
 
 
 # ===== VISTAS DE PRODUCTOS =====
 
-def producto_lista(request):
-    """Lista de productos con información (acceso público)"""
-    productos = Producto.objects.all()
+def armar_productos_info(productos, stock, solo_disponibles=False):
+    """Datos de cada tarjeta del catálogo (las métricas ya vienen anotadas)"""
     productos_info = []
-    
     for producto in productos:
+        if solo_disponibles and producto.pk not in stock:
+            continue
         productos_info.append({
             'producto': producto,
-            'costo': producto.calcular_costo(),
-            'calorias': producto.calcular_calorias(),
-            'rentabilidad': producto.calcular_rentabilidad(),
-            'hay_stock': producto.hay_inventario_disponible()
+            'costo': producto.costo,
+            'calorias': producto.calorias_totales,
+            'rentabilidad': producto.rentabilidad,
+            'hay_stock': producto.pk in stock
         })
-    
-    return render(request, 'heladeria/producto_lista.html', {'productos_info': productos_info})
+    return productos_info
+
+
+def producto_lista(request):
+    """Lista de productos con información (acceso público)"""
+    # Productos y disponibilidad en caché: las ventas solo invalidan la disponibilidad
+    # ?disponibles=1 muestra solo los productos con stock
+    solo_disponibles = bool(request.GET.get('disponibles'))
+    context = {
+        'productos_info': armar_productos_info(productos_catalogo(), stock_productos(), solo_disponibles),
+        'solo_disponibles': solo_disponibles,
+        'version_catalogo': version_catalogo(),
+        'cache_timeout': settings.CATALOGO_CACHE_TIMEOUT
+    }
+    return render(request, 'heladeria/producto_lista.html', context)
 
 
 def producto_detalle(request, pk):
     """Detalle de un producto específico"""
-    producto = get_object_or_404(Producto, pk=pk)
+    producto = get_object_or_404(Producto.objects.with_metrics(), pk=pk)
     context = {
         'producto': producto,
-        'costo': producto.calcular_costo(),
-        'calorias': producto.calcular_calorias(),
-        'rentabilidad': producto.calcular_rentabilidad(),
+        'costo': producto.costo,
+        'calorias': producto.calorias_totales,
+        'rentabilidad': producto.rentabilidad,
         'ingredientes': producto.ingredientes.all(),
-        'hay_stock': producto.hay_inventario_disponible()
+        'hay_stock': producto.disponible
     }
     return render(request, 'heladeria/producto_detalle.html', context)
 
@@ -181,8 +214,59 @@ def producto_eliminar(request, pk):
 @user_passes_test(es_empleado)
 def ingrediente_lista(request):
     """Lista de ingredientes (solo empleados y admin)"""
-    ingredientes = Ingrediente.objects.all()
-    return render(request, 'heladeria/ingrediente_lista.html', {'ingredientes': ingredientes})
+    # Existencias = inventario + lo repartido en fragmentos (ingredientes fragmentados)
+    ingredientes = Ingrediente.objects.con_existencias()
+    
+    # ?al=AAAA-MM-DD: stock al final de ese día según el libro de movimientos
+    al = None
+    if request.GET.get('al'):
+        try:
+            al = date.fromisoformat(request.GET['al'])
+        except ValueError:
+            messages.error(request, 'Fecha inválida, usa el formato AAAA-MM-DD.')
+        else:
+            _, fin = rango_fechas(al, al)
+            ingredientes = ingredientes.con_stock_al(fin)
+    
+    return render(request, 'heladeria/ingrediente_lista.html', {'ingredientes': ingredientes, 'al': al})
+
+
+@login_required
+@user_passes_test(es_empleado)
+def ingrediente_pronostico(request):
+    """
+    Ingredientes que se agotan pronto según el consumo reciente (solo empleados y admin).
+    Filtros: ?umbral= (días, por defecto 14), ?todos=1 para ver todos y ?formato=json
+    """
+    try:
+        umbral = int(request.GET.get('umbral') or 14)
+    except ValueError:
+        return HttpResponseBadRequest('Umbral inválido.')
+    if umbral < 0:
+        return HttpResponseBadRequest('Umbral inválido.')
+    todos = request.GET.get('todos') == '1'
+    
+    datos, filas = pronostico(None if todos else umbral)
+    
+    if request.GET.get('formato') == 'json':
+        return JsonResponse({
+            'generado': datos['generado'].isoformat(),
+            'dias': datos['dias'],
+            'umbral': None if todos else umbral,
+            'ingredientes': [
+                {**fila, 'agotamiento': fila['agotamiento'] and fila['agotamiento'].isoformat()}
+                for fila in filas
+            ],
+        })
+    
+    context = {
+        'filas': filas,
+        'generado': datos['generado'],
+        'dias': datos['dias'],
+        'umbral': umbral,
+        'todos': todos,
+    }
+    return render(request, 'heladeria/ingrediente_pronostico.html', context)
 
 
 @login_required
@@ -235,6 +319,20 @@ def ingrediente_eliminar(request, pk):
 
 # ===== VISTAS DE VENTAS =====
 
+def venta_a_dict(venta, con_usuario=False):
+    """Datos de una venta para las respuestas JSON"""
+    datos = {
+        'id': venta.id,
+        'producto': venta.producto.nombre,
+        'cantidad': venta.cantidad,
+        'total': str(venta.total),
+        'fecha': venta.fecha.isoformat()
+    }
+    if con_usuario:
+        datos['usuario'] = venta.usuario.username
+    return datos
+
+
 @login_required
 @user_passes_test(es_cliente)
 def venta_crear(request):
@@ -245,14 +343,20 @@ def venta_crear(request):
             venta = form.save(commit=False)
             venta.usuario = request.user
             
-            # Verificar inventario
-            if not venta.producto.hay_inventario_disponible():
+            # Verificación previa sin consultas (el producto ya lo cargó el formulario)
+            if not venta.producto.disponible:
                 messages.error(request, 'No hay inventario suficiente para este producto.')
                 return redirect('producto_lista')
             
             # Calcular total
             venta.total = venta.producto.precio_publico * venta.cantidad
-            venta.save()
+            
+            # Guardar la venta: verifica y descuenta el inventario en una sola transacción
+            try:
+                venta.save()
+            except InventarioInsuficiente:
+                messages.error(request, 'No hay inventario suficiente para este producto.')
+                return redirect('producto_lista')
             
             messages.success(request, f'Venta realizada exitosamente. Total: ${venta.total}')
             return redirect('producto_lista')
@@ -262,36 +366,181 @@ def venta_crear(request):
     return render(request, 'heladeria/venta_form.html', {'form': form})
 
 
+@login_required
+@user_passes_test(es_cliente)
+def pedido_crear(request):
+    """Realizar un pedido con varios productos (clientes autenticados)"""
+    if request.method == 'POST':
+        formset = LineaPedidoFormSet(request.POST)
+        if formset.is_valid():
+            lineas = [
+                (form.cleaned_data['producto'], form.cleaned_data['cantidad'])
+                for form in formset.forms if form.cleaned_data
+            ]
+            
+            # Valida el inventario de toda la canasta y registra todo en una transacción
+            try:
+                pedido = Pedido.objects.crear(request.user, lineas)
+            except InventarioInsuficiente:
+                messages.error(request, 'No hay inventario suficiente para este pedido.')
+                return redirect('producto_lista')
+            
+            messages.success(request, f'Pedido realizado exitosamente. Total: ${pedido.total}')
+            return redirect('mis_compras')
+    else:
+        formset = LineaPedidoFormSet()
+    
+    return render(request, 'heladeria/pedido_form.html', {'formset': formset})
+
+
 @login_required
 @user_passes_test(es_administrador)
 def venta_lista(request):
     """Lista de todas las ventas (solo administrador)"""
     ventas = Venta.objects.all().select_related('producto', 'usuario')
     
-    # Estadísticas
-    total_ventas = ventas.aggregate(total=Sum('total'))['total'] or 0
-    ventas_hoy = ventas.filter(fecha__date=timezone.now().date())
-    total_hoy = ventas_hoy.aggregate(total=Sum('total'))['total'] or 0
+    # Filtro opcional por periodo (hoy, semana, mes) con rango de fechas indexado
+    periodo = request.GET.get('periodo')
+    if periodo in dict(PERIODOS):
+        ventas = ventas.del_periodo(periodo)
+    else:
+        periodo = None
+    
+    # Estadísticas desde el resumen diario (una sola consulta)
+    hoy = Q(fecha=timezone.localdate())
+    estadisticas = VentaDiaria.objects.aggregate(
+        total_ventas=Sum('total'),
+        total_hoy=Sum('total', filter=hoy),
+        cantidad_hoy=Sum('ventas', filter=hoy)
+    )
+    
+    # Página de 50 ventas por cursor (fecha, id)
+    pagina = paginar_por_cursor(request, ventas)
+    
+    if request.GET.get('formato') == 'json':
+        return JsonResponse({
+            'ventas': [venta_a_dict(venta, con_usuario=True) for venta in pagina['objetos']],
+            'siguiente': pagina['siguiente'],
+            'anterior': pagina['anterior'],
+            'total_ventas': str(estadisticas['total_ventas'] or 0),
+            'total_hoy': str(estadisticas['total_hoy'] or 0),
+            'cantidad_hoy': estadisticas['cantidad_hoy'] or 0
+        })
     
     context = {
-        'ventas': ventas[:50],  # Últimas 50 ventas
-        'total_ventas': total_ventas,
-        'total_hoy': total_hoy,
-        'cantidad_hoy': ventas_hoy.count()
+        'ventas': pagina['objetos'],
+        'pagina': pagina,
+        'total_ventas': estadisticas['total_ventas'] or 0,
+        'total_hoy': estadisticas['total_hoy'] or 0,
+        'cantidad_hoy': estadisticas['cantidad_hoy'] or 0,
+        'periodos': PERIODOS,
+        'periodo': periodo
     }
     
     return render(request, 'heladeria/venta_lista.html', context)
 
 
+@login_required
+@user_passes_test(es_administrador)
+def venta_analitica(request):
+    """
+    Ventas por hora del día, día, semana o mes, en total, por tipo o por producto (solo administrador).
+    Filtros: ?desde= y ?hasta= (AAAA-MM-DD, por defecto los últimos 30 días),
+    ?granularidad=hora|dia|semana|mes, ?agrupacion=total|tipo|producto y ?formato=json
+    """
+    granularidad = request.GET.get('granularidad') or 'dia'
+    agrupacion = request.GET.get('agrupacion') or 'total'
+    if granularidad not in dict(GRANULARIDADES) or agrupacion not in dict(AGRUPACIONES):
+        return HttpResponseBadRequest('Granularidad o agrupación inválida.')
+    
+    hoy = timezone.localdate()
+    try:
+        hasta = date.fromisoformat(request.GET['hasta']) if request.GET.get('hasta') else hoy
+        desde = date.fromisoformat(request.GET['desde']) if request.GET.get('desde') else hasta - timedelta(days=29)
+    except ValueError:
+        return HttpResponseBadRequest('Fechas inválidas, usa el formato AAAA-MM-DD.')
+    if desde > hasta or (hasta - desde).days >= MAX_DIAS:
+        return HttpResponseBadRequest(f'El rango debe ser de 1 a {MAX_DIAS} días.')
+    
+    filas = resumen_ventas(desde, hasta, granularidad, agrupacion)
+    
+    if request.GET.get('formato') == 'json':
+        return JsonResponse({
+            'desde': desde.isoformat(),
+            'hasta': hasta.isoformat(),
+            'granularidad': granularidad,
+            'agrupacion': agrupacion,
+            'filas': filas,
+        })
+    
+    context = {
+        'filas': filas,
+        'filtros': {'desde': desde, 'hasta': hasta, 'granularidad': granularidad, 'agrupacion': agrupacion},
+        'granularidades': GRANULARIDADES,
+        'agrupaciones': AGRUPACIONES,
+    }
+    return render(request, 'heladeria/venta_analitica.html', context)
+
+
+@login_required
+@user_passes_test(es_administrador)
+def venta_exportar(request):
+    """Exportar ventas a CSV o NDJSON en streaming (solo administrador)"""
+    formato = request.GET.get('formato', 'csv')
+    if formato not in FORMATOS:
+        return HttpResponseBadRequest('Formato no soportado.')
+    
+    try:
+        desde = date.fromisoformat(request.GET['desde']) if request.GET.get('desde') else None
+        hasta = date.fromisoformat(request.GET['hasta']) if request.GET.get('hasta') else None
+    except ValueError:
+        return HttpResponseBadRequest('Fechas inválidas, usa el formato AAAA-MM-DD.')
+    
+    inicio, fin = rango_fechas(desde, hasta)
+    response = StreamingHttpResponse(
+        generar_exportacion(formato, filas_ventas(inicio, fin)),
+        content_type=FORMATOS[formato]
+    )
+    response['Content-Disposition'] = f'attachment; filename="ventas.{formato}"'
+    return response
+
+
+def total_gastado(usuario):
+    """
+    Suma de todas las compras del usuario. Con una caché compartida se guarda hasta su
+    próxima venta (las señales la borran); con LocMem se suma cada vez, porque el borrado
+    solo llegaría al worker que registró la venta
+    """
+    clave = clave_total_gastado(usuario.pk)
+    total = cache.get(clave) if cache_compartida() else None
+    if total is None:
+        total = Venta.objects.filter(usuario=usuario).aggregate(total=Sum('total'))['total'] or Decimal('0')
+        if cache_compartida():
+            cache.set(clave, total, settings.TOTAL_GASTADO_CACHE_TIMEOUT)
+    return total
+
+
 @login_required
 def mis_compras(request):
     """Ver mis compras (usuario autenticado)"""
     ventas = Venta.objects.filter(usuario=request.user).select_related('producto')
-    total_gastado = ventas.aggregate(total=Sum('total'))['total'] or 0
+    total_gastado_usuario = total_gastado(request.user)
+    
+    # Página de 50 compras por cursor (fecha, id) usando el índice (usuario, fecha)
+    pagina = paginar_por_cursor(request, ventas)
+    
+    if request.GET.get('formato') == 'json':
+        return JsonResponse({
+            'ventas': [venta_a_dict(venta) for venta in pagina['objetos']],
+            'siguiente': pagina['siguiente'],
+            'anterior': pagina['anterior'],
+            'total_gastado': str(total_gastado_usuario)
+        })
     
     context = {
-        'ventas': ventas,
-        'total_gastado': total_gastado
+        'ventas': pagina['objetos'],
+        'pagina': pagina,
+        'total_gastado': total_gastado_usuario
     }
     
     return render(request, 'heladeria/mis_compras.html', context)
@@ -299,33 +548,154 @@ def mis_compras(request):
 
 # ===== VISTA DE PRODUCTO MÁS RENTABLE =====
 
+# Ranking por rentabilidad unitaria o por ganancia realizada en el periodo
+ORDENES_RANKING = {'rentabilidad': 'puesto_rentabilidad', 'ganancia': 'puesto_ganancia'}
+MAX_RANKING = 100
+
+
 @login_required
 @user_passes_test(es_administrador)
 def producto_mas_rentable(request):
-    """Muestra el producto más rentable (solo administrador)"""
-    productos = Producto.objects.all()
+    """
+    Ranking de rentabilidad (solo administrador).
+    La base de datos calcula margen, unidades vendidas y ganancia, ordena con funciones
+    de ventana y devuelve solo los primeros N.
+    Filtros: ?tipo=COPA|MALTEADA, ?desde= y ?hasta= (AAAA-MM-DD), ?n=, ?orden=rentabilidad|ganancia
+    y ?formato=json
+    """
+    tipo = request.GET.get('tipo') or None
+    orden = request.GET.get('orden') or 'rentabilidad'
+    if tipo not in (None, *dict(Producto.TIPO_CHOICES)) or orden not in ORDENES_RANKING:
+        return HttpResponseBadRequest('Filtro inválido.')
+    try:
+        desde = date.fromisoformat(request.GET['desde']) if request.GET.get('desde') else None
+        hasta = date.fromisoformat(request.GET['hasta']) if request.GET.get('hasta') else None
+        limite = min(max(int(request.GET.get('n', 20)), 1), MAX_RANKING)
+    except ValueError:
+        return HttpResponseBadRequest('Fechas inválidas (AAAA-MM-DD) o n no es un número.')
     
-    if not productos:
-        messages.info(request, 'No hay productos registrados.')
-        return redirect('dashboard')
+    productos = Producto.objects.all()
+    if tipo:
+        productos = productos.filter(tipo=tipo)
+    ranking = list(
+        productos.ranking_rentabilidad(desde, hasta)
+        .order_by(ORDENES_RANKING[orden], 'nombre')[:limite]
+    )
     
-    # Calcular rentabilidad de cada producto
-    productos_rentabilidad = []
-    for producto in productos:
-        rentabilidad = producto.calcular_rentabilidad()
-        productos_rentabilidad.append({
-            'producto': producto,
-            'rentabilidad': rentabilidad,
-            'costo': producto.calcular_costo(),
-            'precio': producto.precio_publico
+    if request.GET.get('formato') == 'json':
+        def centavos(valor):
+            return None if valor is None else str(valor.quantize(Decimal('0.01')))
+        
+        return JsonResponse({
+            'orden': orden,
+            'productos': [
+                {
+                    'id': producto.pk,
+                    'nombre': producto.nombre,
+                    'tipo': producto.tipo,
+                    'precio': str(producto.precio_publico),
+                    'costo': str(producto.costo),
+                    'rentabilidad': centavos(producto.rentabilidad),
+                    'margen': centavos(producto.margen),
+                    'unidades': producto.unidades,
+                    'ingresos': centavos(producto.ingresos),
+                    'ganancia': centavos(producto.ganancia),
+                    'puesto_rentabilidad': producto.puesto_rentabilidad,
+                    'puesto_ganancia': producto.puesto_ganancia,
+                }
+                for producto in ranking
+            ],
         })
     
-    # Ordenar por rentabilidad descendente
-    productos_rentabilidad.sort(key=lambda x: x['rentabilidad'], reverse=True)
+    if not ranking and not tipo:
+        messages.info(request, 'No hay productos registrados.')
+        return redirect('dashboard')
     
     context = {
-        'productos_rentabilidad': productos_rentabilidad,
-        'mas_rentable': productos_rentabilidad[0] if productos_rentabilidad else None
+        'ranking': ranking,
+        'mas_rentable': ranking[0] if ranking else None,
+        'tipos': Producto.TIPO_CHOICES,
+        'filtros': {'tipo': tipo, 'desde': desde, 'hasta': hasta, 'n': limite, 'orden': orden},
     }
     
     return render(request, 'heladeria/producto_rentable.html', context)
+
+
+# ===== API JSON DEL CATÁLOGO (v1) =====
+# Pensada para kioscos y la app móvil, que consultan el catálogo cada pocos segundos.
+# El ETag y Last-Modified salen de la caché: si el cliente ya tiene la versión actual
+# se responde 304 sin consultar las tablas de productos.
+# Con la caché en memoria cada worker tiene sus propias versiones y su propia fecha de
+# modificación: el ETag sale del contenido (el mismo en todos los workers) y no se envía
+# Last-Modified.
+
+def etag_catalogo(request):
+    if cache_compartida():
+        return f'"{version_catalogo()}-{version_stock()}"'
+    return f'"{md5(catalogo_json(), usedforsecurity=False).hexdigest()}"'
+
+
+def modificacion_catalogo(request):
+    if cache_compartida():
+        return ultima_modificacion()
+    return None
+
+
+@require_GET
+@gzip_page
+@cache_control(public=True, no_cache=True)
+@condition(etag_func=etag_catalogo, last_modified_func=modificacion_catalogo)
+def api_catalogo(request):
+    """Catálogo público en JSON (acceso público)"""
+    return HttpResponse(catalogo_json(), content_type='application/json')
+
+
+# ===== VISTAS ASÍNCRONAS DEL CATÁLOGO (ASGI) =====
+# Mismo resultado que home, producto_lista y producto_detalle, pero con el ORM asíncrono.
+# Se activan con CATALOGO_ASYNC=True al desplegar con un servidor ASGI (uvicorn).
+# El render va en un hilo (sync_to_async): los {% cache %} de las plantillas y la carga
+# de request.user hacen E/S bloqueante (consultas con CACHE_DB, sockets con Redis)
+
+arender = sync_to_async(render)
+
+
+async def home_async(request):
+    """Página principal (versión asíncrona)"""
+    context = {
+        'productos': await aproductos_catalogo(),
+        'version_catalogo': await aversion_catalogo(),
+        'cache_timeout': settings.CATALOGO_CACHE_TIMEOUT
+    }
+    return await arender(request, 'heladeria/home.html', context)
+
+
+async def producto_lista_async(request):
+    """Lista de productos (versión asíncrona)"""
+    solo_disponibles = bool(request.GET.get('disponibles'))
+    context = {
+        'productos_info': armar_productos_info(
+            await aproductos_catalogo(), await astock_productos(), solo_disponibles
+        ),
+        'solo_disponibles': solo_disponibles,
+        'version_catalogo': await aversion_catalogo(),
+        'cache_timeout': settings.CATALOGO_CACHE_TIMEOUT
+    }
+    return await arender(request, 'heladeria/producto_lista.html', context)
+
+
+async def producto_detalle_async(request, pk):
+    """Detalle de un producto específico (versión asíncrona)"""
+    try:
+        producto = await Producto.objects.with_metrics().aget(pk=pk)
+    except Producto.DoesNotExist:
+        raise Http404('No existe el producto.')
+    
+    context = {
+        'producto': producto,
+        'costo': producto.costo,
+        'calorias': producto.calorias_totales,
+        'rentabilidad': producto.rentabilidad,
+        'ingredientes': [ingrediente async for ingrediente in producto.ingredientes.all().aiterator()],
+        'hay_stock': producto.disponible
+    }
+    return await arender(request, 'heladeria/producto_detalle.html', context)